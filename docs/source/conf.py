@@ -39,7 +39,6 @@ exclude_patterns = []
 # Intersphinx.
 intersphinx_mapping = {
     "python": ("https://docs.python.org/3", None),
-    "bs4": ("https://www.crummy.com/software/BeautifulSoup/bs4/doc/", None),
 }
 
 # -- Options for autosummary extension ---------------------------------------
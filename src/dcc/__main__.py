@@ -10,7 +10,6 @@ from datetime import datetime
 from dataclasses import dataclass
 from contextlib import contextmanager
 from tempfile import TemporaryDirectory, NamedTemporaryFile
-from html2text import html2text
 import click
 
 from . import __version__, PROGRAM, AUTHORS, PROJECT_URL
@@ -18,7 +17,7 @@ from .records import DCCArchive, DCCNumber, DCCAuthor
 from .sessions import DCCSession, DCCAuthenticatedSession, DCCUnauthenticatedSession
 from .parsers import DCCParser
 from .env import DEFAULT_HOST, DEFAULT_IDP
-from .util import change_exc_msg, human_file_size
+from .util import change_exc_msg, human_file_size, mapped_file
 from .exceptions import (
     NotLoggedInError,
     UnrecognisedDCCRecordError,
@@ -279,14 +278,24 @@ def _archive_record(
     # Codes already seen.
     seen = set()
 
+    # Categories are tested for every referenced document.
+    skip_categories = frozenset(skip_categories)
+
+    def _skip(number, level):
+        if number.category not in skip_categories:
+            return False
+
+        indent = "-" * (depth - level)
+        state.echo(f"{indent}Skipping {number}.")
+        result.ignored += 1
+        return True
+
     def _do_fetch(number, level=0):
         indent = "-" * (depth - level)
 
         number = DCCNumber(number)
 
-        if number.category in skip_categories:
-            state.echo(f"{indent}Skipping {number}.")
-            result.ignored += 1
+        if _skip(number, level):
             return
 
         state.echo(f"{indent}Fetching {number}...")
@@ -341,19 +350,17 @@ def _archive_record(
                     result.files_archived += 1
 
         if level > 0:
+            refs = []
             if fetch_related:
-                for ref in record.related_to:
-                    if ref.format(version=False) in seen:
-                        continue
-
-                    _do_fetch(ref, level=level - 1)
-
+                refs.extend(record.related_to)
             if fetch_referencing:
-                for ref in record.referenced_by:
-                    if ref.format(version=False) in seen:
-                        continue
+                refs.extend(record.referenced_by)
+
+            for ref in refs:
+                if ref.format(version=False) in seen or _skip(ref, level - 1):
+                    continue
 
-                    _do_fetch(ref, level=level - 1)
+                _do_fetch(ref, level=level - 1)
 
     try:
         _do_fetch(dcc_number, level=depth)
@@ -430,6 +437,7 @@ class _State:
             raise RuntimeError(f"Unrecognised response type {repr(response_type)}.")
 
         # We're downloading a file.
+        chunks = response.iter_content(chunk_size=DCCSession.file_chunk_size)
         content_length = response.headers.get("content-length")
         if content_length:
             content_length = int(content_length)
@@ -463,13 +471,13 @@ class _State:
 
             # Only show progress when not being quiet.
             if self.show_progress and self.verbose:
-                response = self._download_progress_hook(item, response, content_length)
+                chunks = self._download_progress_hook(item, chunks, content_length)
         else:
             self.echo_debug(
                 "Can't show progress or check file size: no Content-Length header."
             )
 
-        yield from response
+        yield from chunks
 
     def _download_progress_hook(self, item, chunks, total_length):
         # Iterate over the chunks, yielding each chunk and updating the progress bar.
@@ -577,6 +585,9 @@ class _State:
         self.echo_key_value(record.dcc_number, record.title)
 
         if detailed:
+            # Only needed here, so avoid its import cost for other commands.
+            from html2text import html2text
+
             self.echo_key_value(
                 "url", session.dcc_record_url(record.dcc_number, xml=False)
             )
@@ -872,6 +883,10 @@ def archive(
                     else:
                         numbers.append(number)
 
+        if numbers:
+            # Get the connection ready while there's nothing else to do.
+            session.prime()
+
         # Archive the numbers.
         result = ArchiveResult()
         try:
@@ -911,7 +926,11 @@ def list_(ctx, full):
     state = ctx.ensure_object(_State)
 
     with state.dcc_archive() as archive, state.dcc_session() as session:
-        for record in archive.records:
+        # Only the number and title of each record are needed unless showing them in
+        # full.
+        records = archive.records if full else archive.shallow_records
+
+        for record in records:
             state.echo_record(record, session, detailed=full)
 
             if full:
@@ -937,16 +956,14 @@ def convert(ctx, src, dst):
 
     with state.dcc_session() as session:
         if urlparse(src).netloc:
-            # The URL is remote.
-            text = session.get(src).text
+            # The URL is remote. Use the raw body to avoid decoding it.
+            dcc_numbers = DCCParser(session.get(src).content).dcc_numbers()
         else:
             # Assume the URL is a local file.
-            with click.open_file(src, "rb") as fobj:
-                text = fobj.read()
-
-        parsed = DCCParser(text)
+            with click.open_file(src, "rb") as fobj, mapped_file(fobj) as content:
+                dcc_numbers = DCCParser(content).dcc_numbers()
 
-        for dcc_number in parsed.dcc_numbers():
+        for dcc_number in dcc_numbers:
             dst.write(f"{dcc_number}\n")
 
 
@@ -1009,19 +1026,23 @@ def update(
     with state.dcc_archive() as archive, state.dcc_session() as session:
         record = archive.fetch_record(dcc_number, overwrite=force, session=session)
 
-        # Apply changes.
-        if title:
-            record.title = title
-        if abstract:
-            record.abstract = abstract
-        if keywords:
-            record.keywords = keywords
-        if note:
-            record.note = note
-        if related:
-            record.related_to = [DCCNumber(ref) for ref in related]
-        if authors:
-            record.authors = [DCCAuthor(name) for name in authors]
+        # Apply changes to the fields that were specified, converting values where
+        # necessary.
+        changes = (
+            ("title", title, None),
+            ("abstract", abstract, None),
+            ("keywords", keywords, None),
+            ("note", note, None),
+            ("related_to", related, DCCNumber),
+            ("authors", authors, DCCAuthor),
+        )
+
+        for field, value, convert in changes:
+            if value:
+                if convert is not None:
+                    value = [convert(item) for item in value]
+
+                setattr(record, field, value)
 
         state.echo_record(record, session, detailed=True)
 
@@ -0,0 +1,68 @@
+"""TOML codec used for record metadata.
+
+The Rust based `rtoml` is used if it is installed (e.g. with the `fast-toml` extra),
+being considerably faster than the pure Python parsers and `tomli_w` used otherwise.
+Without `rtoml`, documents are parsed with the standard library's `tomllib` where
+available (Python 3.11+), or `tomli` (which it is based on) otherwise.
+"""
+
+import datetime
+import tomli_w
+
+try:
+    import rtoml
+except ImportError:
+    rtoml = None
+
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+
+def loads(content):
+    """Parse TOML document.
+
+    Parameters
+    ----------
+    content : bytes
+        The UTF-8 encoded TOML document.
+
+    Returns
+    -------
+    :class:`dict`
+        The parsed document.
+    """
+    content = content.decode("utf-8")
+
+    if rtoml is None:
+        return tomllib.loads(content)
+
+    item = rtoml.loads(content)
+
+    # rtoml's timezones can't be copied or pickled; use the standard library's. Record
+    # dates are all top level.
+    for key, value in item.items():
+        if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+            item[key] = value.replace(tzinfo=datetime.timezone(value.utcoffset()))
+
+    return item
+
+
+def dumps(item):
+    """Serialise TOML document.
+
+    Parameters
+    ----------
+    item : :class:`dict`
+        The document to serialise. It must not contain None values.
+
+    Returns
+    -------
+    str
+        The TOML document.
+    """
+    if rtoml is None:
+        return tomli_w.dumps(item, multiline_strings=True)
+
+    return rtoml.dumps(item)
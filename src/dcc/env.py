@@ -4,3 +4,5 @@ import os
 
 DEFAULT_HOST = os.environ.get("DCC_HOST", "dcc.ligo.org")
 DEFAULT_IDP = os.environ.get("ECP_IDP", "login.ligo.org")
+# Whether to cache parsed record metadata in files alongside the metadata.
+RECORD_CACHE = os.environ.get("DCC_RECORD_CACHE", "0") == "1"
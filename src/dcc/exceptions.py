@@ -4,33 +4,31 @@
 class NotLoggedInError(Exception):
     """Error due to user not being logged in."""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__("You are not logged in to the DCC.", *args, **kwargs)
+    def __init__(self, *args):
+        super().__init__("You are not logged in to the DCC.", *args)
 
 
 class UnrecognisedDCCRecordError(Exception):
     """Error for when a page is not recognised by the DCC server."""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args):
         super().__init__(
-            "The retrieved page was not recognised as a valid record.", *args, **kwargs
+            "The retrieved page was not recognised as a valid record.", *args
         )
 
 
 class UnauthorisedError(Exception):
     """Error for when a document is not available to the user to be viewed."""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(
-            "You do not have permission to view this record.", *args, **kwargs
-        )
+    def __init__(self, *args):
+        super().__init__("You do not have permission to view this record.", *args)
 
 
 class NoVersionError(Exception):
     """Exception for when a DCC number has not got a version specified."""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__("The DCC number has no specified version.", *args, **kwargs)
+    def __init__(self, *args):
+        super().__init__("The DCC number has no specified version.", *args)
 
 
 class FileSkippedException(Exception):
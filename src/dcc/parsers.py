@@ -2,39 +2,221 @@
 
 
 import re
-from functools import cached_property
+from io import BytesIO
+from functools import lru_cache
 from datetime import datetime
-import xml.etree.ElementTree as ET
-import pytz
-from bs4 import BeautifulSoup
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9.
+    from backports.zoneinfo import ZoneInfo
+
+from lxml import etree, html
 from .exceptions import (
     NotLoggedInError,
     UnrecognisedDCCRecordError,
     UnauthorisedError,
 )
 
+# DCC dates use the Pacific timezone.
+_DCC_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Parsers for text content, which has to be passed to lxml as bytes.
+_UTF8_HTML_PARSER = html.HTMLParser(encoding="utf-8")
+_UTF8_XML_PARSER = etree.XMLParser(encoding="utf-8")
+
+# The login page, identified by the presence of an h3 with specific text.
+_LOGIN_PAGE_TEXT = "Accessing private documents"
+_LOGIN_PAGE_XPATH = f"//h3[normalize-space()='{_LOGIN_PAGE_TEXT}']"
+# The default page (DCC redirects here for all unrecognised requests).
+_DEFAULT_PAGE_TEXT = "Search for Documents by"
+_DEFAULT_PAGE_XPATH = f"//strong[normalize-space()='{_DEFAULT_PAGE_TEXT}']"
+# The error page's message.
+_ERROR_MESSAGE_XPATH = "//dt[@class='Error']/following-sibling::dd"
+
+# Elements identifying record error pages.
+_RECORD_ERROR_PAGE_XPATH = etree.XPath(
+    " | ".join(
+        (
+            _LOGIN_PAGE_XPATH,
+            _DEFAULT_PAGE_XPATH,
+            _ERROR_MESSAGE_XPATH
+            + "[contains(., 'is not authorized to view this document')]",
+        )
+    )
+)
+
+# Words that record error pages must contain. The text in the XPaths above has its
+# whitespace normalised, so only single words can be searched for in raw content.
+_RECORD_ERROR_PAGE_MARKERS = (b"Accessing", b"Search", b"authorized")
+
+# Update result page messages. These are plain substrings, so no regular expressions
+# are needed to find them.
+_UPDATE_SUCCESS_TEXT = "You were successful"
+_UPDATE_INVALID_TEXT = " is invalid"
+_UPDATE_UNAUTHORISED_TEXT = " is not modifiable by user"
+
+
+class cached_property:
+    """Property computed once per instance and then cached as an instance attribute.
+
+    Unlike :func:`functools.cached_property` this takes no lock on first access,
+    which parsers (never shared between threads) don't need.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # Being a non-data descriptor, the cached value shadows this from now on.
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+# Control characters not allowed in XML documents (all but tab, line feed and carriage
+# return).
+_XML_CONTROL_CHARACTERS = bytes(
+    char for char in range(0x20) if char not in (0x09, 0x0A, 0x0D)
+)
+_XML_CONTROL_CHARACTER_PATTERN = re.compile(
+    b"[" + re.escape(_XML_CONTROL_CHARACTERS) + b"]"
+)
+
+# Documents larger than this many bytes are parsed incrementally.
+_INCREMENTAL_PARSE_SIZE = 1024 * 1024
+
+
+def _text(element):
+    """The text of `element`, or None if it is empty (as ElementTree would give)."""
+    return element.text or None
+
+
+def _all_text(element):
+    """The text of `element` including that of its descendants."""
+    return "".join(element.itertext())
+
+
+def _normalized_text(element):
+    """The text of `element` with whitespace normalised, as XPath's normalize-space."""
+    return " ".join(_all_text(element).split())
+
+
+def _is_error_message(element):
+    """Whether `element` is the message following a DCC error page's error title."""
+    previous = element.getprevious()
+    return (
+        previous is not None
+        and previous.tag == "dt"
+        and previous.get("class") == "Error"
+    )
+
+
+@lru_cache(maxsize=None)
+def _dcc_number_pattern(bytes_):
+    """Compiled pattern matching potential DCC numbers in text, or bytes if `bytes_` is
+    True."""
+    # Avoid a circular import.
+    from .records import DCCNumber
+
+    available_letters = "".join(DCCNumber.document_type_letters)
+    pattern = fr"(LIGO-)?([{available_letters}]\d{{5,}}(-(x0|v\d+))?)"
+
+    if bytes_:
+        pattern = pattern.encode("ascii")
+
+    return re.compile(pattern)
+
+
+def _author_fields(element):
+    name = _text(element.find("fullname"))
+
+    try:
+        enum = _text(element.find("employeenumber"))
+    except AttributeError:
+        enum = None
+
+    return name, enum, element.get("id")
+
+
+def _file_fields(element):
+    name = _text(element.find("name"))
+
+    try:
+        title = _text(element.find("description"))
+    except AttributeError:
+        title = name
+
+    url = element.attrib["href"]
+    return title, name, url
+
+
+def _ref_alias(element):
+    # Note some xref elements don't have an alias, e.g. M950046.
+    return element.attrib.get("alias")
+
+
+# Extractors for the fields of repeated document revision elements.
+_REPEATED_FIELDS = {
+    "author": _author_fields,
+    "keyword": _text,
+    "file": _file_fields,
+    "xrefto": _ref_alias,
+    "xrefby": _ref_alias,
+}
+
 
 class DCCParser:
     """A parser for DCC documents.
 
     Parameters
     ----------
-    content : str
-        The response body.
+    content : str or bytes-like
+        The response body. Bytes-like content (e.g. :class:`bytes` or
+        :class:`mmap.mmap`) is searched for DCC numbers without being decoded.
     """
 
     def __init__(self, content):
         self.content = content
 
-    def html_navigator(self):
-        """An HTML navigator for the document content.
+    @cached_property
+    def html_tree(self):
+        """An lxml HTML tree for the document content.
+
+        The tree is created on first access and reused thereafter.
 
         Returns
         -------
-        :class:`bs4.BeautifulSoup`
-            The HTML navigator.
+        :class:`lxml.html.HtmlElement`
+            The root element.
         """
-        return BeautifulSoup(self.content, "html.parser")
+        content, utf8 = self._lxml_content()
+        return html.fromstring(content, parser=_UTF8_HTML_PARSER if utf8 else None)
+
+    def _lxml_content(self):
+        """The content in a form accepted by lxml, and whether it is UTF-8 encoded.
+
+        lxml refuses text with an encoding declaration, so text is encoded as UTF-8 and
+        must be parsed as such regardless of any declared encoding.
+        """
+        if isinstance(self.content, str):
+            return self.content.encode("utf-8"), True
+
+        return self.content, False
+
+    def _find_html(self, xpath):
+        """Evaluate `xpath` against the HTML tree, treating unparsable documents as
+        containing nothing."""
+        try:
+            return xpath(self.html_tree)
+        except etree.ParserError:
+            # The document is empty.
+            return []
 
     def dcc_numbers(self):
         """Potential DCC numbers contained within the text of the document.
@@ -44,22 +226,21 @@ class DCCParser:
         :class:`set`
             Potential DCC numbers.
         """
-        from .records import DCCNumber
-
-        available_letters = "".join(DCCNumber.document_type_letters)
-        dcc_number_pattern = re.compile(
-            fr"(LIGO-)?([{available_letters}]\d{{5,}}(-(x0|v\d+))?)"
-        )
+        # Search the raw content. The text is already decoded, and DCC numbers are
+        # ASCII so there's no need to decode bytes (or to parse the document, which
+        # need not be HTML) first.
+        bytes_ = not isinstance(self.content, str)
+        dcc_number_pattern = _dcc_number_pattern(bytes_=bytes_)
 
         found = set()
 
-        # Search for DCC numbers in the text.
-        # Use the HTML navigator so BeautifulSoup deals with the encoding, even though
-        # we don't necessary insist the input is HTML.
-        navigator = self.html_navigator()
-        for match in dcc_number_pattern.findall(str(navigator)):
-            if match:
-                found.add(match[1])
+        for match in dcc_number_pattern.finditer(self.content):
+            number = match.group(2)
+
+            if isinstance(number, bytes):
+                number = number.decode("ascii")
+
+            found.add(number)
 
         return found
 
@@ -70,41 +251,44 @@ class DCCXMLRecordParser(DCCParser):
     def __init__(self, content):
         super().__init__(content)
         self.docrev = None
+        # Repeated elements extracted during incremental parsing, if used.
+        self._repeated = None
         self._parse()
 
     def _parse(self):
         # Strip out anything not supposed to be here, that would otherwise cause parser
         # errors.
-        content = self.content.replace("\u000b", "")  # Line feed character (L1200193)
+        content, utf8 = self._lxml_content()
+        if _XML_CONTROL_CHARACTER_PATTERN.search(content):
+            # E.g. the line tabulation character in L1200193.
+            content = content.translate(None, _XML_CONTROL_CHARACTERS)
 
         try:
-            self.root = ET.fromstring(content)
-        except ET.ParseError:
-            # This is not an XML document. Do we have an error page instead? Use the
-            # HTML parser to find out.
-            navigator = self.html_navigator()
-
-            # Check if we have the login page, specified by the presence of an h3 with
-            # specific text.
-            if navigator.find("h3", text="Accessing private documents"):
+            if len(content) > _INCREMENTAL_PARSE_SIZE:
+                self.root = self._parse_incrementally(content, utf8)
+            else:
+                self.root = etree.fromstring(
+                    content, parser=_UTF8_XML_PARSER if utf8 else None
+                )
+        except etree.XMLSyntaxError:
+            # This is not an XML document. Do we have an error page instead? Only
+            # documents containing one of the error pages' words can be one, so avoid
+            # parsing others as HTML.
+            if not any(marker in content for marker in _RECORD_ERROR_PAGE_MARKERS):
+                raise
+
+            # Use the HTML parser to find out.
+            found = self._find_html(_RECORD_ERROR_PAGE_XPATH)
+            tags = {element.tag for element in found}
+
+            if "h3" in tags:
                 raise NotLoggedInError()
 
-            # Check if we have the default page (DCC redirects here for all unrecognised
-            # requests).
-            if navigator.find("strong", text="Search for Documents by"):
+            if "strong" in tags:
                 raise UnrecognisedDCCRecordError()
 
-            # Check if we have the error page.
-            if navigator.find("dt", class_="Error"):
-                # We have an error, but what is its message?
-                if navigator.find(
-                    "dd",
-                    text=re.compile(
-                        "User .*? is not authorized to view this document."
-                    ),
-                ):
-                    # Unauthorised.
-                    raise UnauthorisedError()
+            if "dd" in tags:
+                raise UnauthorisedError()
 
             raise
 
@@ -114,6 +298,38 @@ class DCCXMLRecordParser(DCCParser):
 
         self.docrev = self.root[0][0]
 
+    def _parse_incrementally(self, content, utf8):
+        """Parse a large document, extracting the fields of repeated document revision
+        elements as they are parsed and then discarding them to limit memory use."""
+        self._repeated = {tag: [] for tag in _REPEATED_FIELDS}
+        docrev = None
+
+        events = etree.iterparse(
+            BytesIO(content),
+            events=("start", "end"),
+            encoding="utf-8" if utf8 else None,
+        )
+
+        for event, element in events:
+            if event == "start":
+                if docrev is None and element.tag == "docrevision":
+                    # The first revision is the one the document is about.
+                    docrev = element
+            elif element.tag in self._repeated and element.getparent() is docrev:
+                self._repeated[element.tag].append(
+                    _REPEATED_FIELDS[element.tag](element)
+                )
+                docrev.remove(element)
+
+        return events.root
+
+    def _repeated_fields(self, tag):
+        """The fields of each `tag` element in the document revision."""
+        if self._repeated is not None:
+            return self._repeated[tag]
+
+        return map(_REPEATED_FIELDS[tag], self.docrev.findall(tag))
+
     @cached_property
     def dcc_number_pieces(self):
         t = self.docrev.find("dccnumber").text[0]
@@ -127,35 +343,27 @@ class DCCXMLRecordParser(DCCParser):
 
     @cached_property
     def title(self):
-        return self.docrev.find("title").text
+        return _text(self.docrev.find("title"))
 
     @cached_property
     def authors(self):
-        for a in self.docrev.findall("author"):
-            name = a.find("fullname").text
-
-            try:
-                enum = a.find("employeenumber").text
-            except AttributeError:
-                enum = None
-
-            yield name, enum, a.get("id")
+        return list(self._repeated_fields("author"))
 
     @cached_property
     def abstract(self):
-        return self.docrev.find("abstract").text
+        return _text(self.docrev.find("abstract"))
 
     @cached_property
     def keywords(self):
-        return [k.text for k in self.docrev.findall("keyword")]
+        return list(self._repeated_fields("keyword"))
 
     @cached_property
     def note(self):
-        return self.docrev.find("note").text
+        return _text(self.docrev.find("note"))
 
     @cached_property
     def publication_info(self):
-        return self.docrev.find("publicationinfo").text
+        return _text(self.docrev.find("publicationinfo"))
 
     @cached_property
     def journal_reference(self):
@@ -164,10 +372,10 @@ class DCCXMLRecordParser(DCCParser):
         if not ref:
             return
 
-        journal = ref.find("journal").text
-        volume = ref.find("volume").text
-        page = ref.find("page").text
-        citation = ref.find("citation").text
+        journal = _text(ref.find("journal"))
+        volume = _text(ref.find("volume"))
+        page = _text(ref.find("page"))
+        citation = _text(ref.find("citation"))
         url = ref.attrib.get("href")
 
         return journal, volume, page, citation, url
@@ -180,29 +388,24 @@ class DCCXMLRecordParser(DCCParser):
 
     @cached_property
     def revision_dates(self):
-        # DCC dates use the Pacific timezone
-        pacific = pytz.timezone("US/Pacific")
-
-        # parse modified date string localised to Pacific Time
-        modified = pacific.localize(
-            datetime.strptime(self.docrev.attrib["modified"], "%Y-%m-%d %H:%M:%S")
+        # parse modified date string ("YYYY-MM-DD HH:MM:SS") localised to Pacific Time
+        modified = datetime.fromisoformat(self.docrev.attrib["modified"]).replace(
+            tzinfo=_DCC_TIMEZONE
         )
 
+        if modified.dst():
+            # take ambiguous times (when clocks go back) as standard time, as pytz did
+            standard = modified.replace(fold=1)
+
+            if not standard.dst():
+                modified = standard
+
         # other dates aren't in XML yet
         return None, modified, None
 
     @cached_property
     def attached_files(self):
-        for file_ in self.docrev.findall("file"):
-            name = file_.find("name").text
-
-            try:
-                title = file_.find("description").text
-            except AttributeError:
-                title = name
-
-            url = file_.attrib["href"]
-            yield title, name, url
+        return list(self._repeated_fields("file"))
 
     @cached_property
     def related_ids(self):
@@ -213,44 +416,68 @@ class DCCXMLRecordParser(DCCParser):
         return self._extract_refs("xrefby")
 
     def _extract_refs(self, field):
-        for field in self.docrev.findall(field):
-            # Extract the DCC number.
-            # Note some xref elements don't have an alias, e.g. M950046; these are
-            # ignored.
-            alias = field.attrib.get("alias")
-            if alias:
-                yield alias
+        # Extract the DCC numbers. Elements without an alias are ignored.
+        return [alias for alias in self._repeated_fields(field) if alias]
 
 
 class DCCXMLUpdateParser(DCCParser):
     """A parser for DCC XMLUpdate responses."""
 
     def _parse(self):
-        # Get an HTML navigator object for the record.
-        navigator = self.html_navigator()
-
-        # Accept if the page reports a successful modification.
-        if navigator.find(string=re.compile(".*You were successful.*")):
-            return
+        content, utf8 = self._lxml_content()
+        events = etree.iterparse(
+            BytesIO(content),
+            events=("end",),
+            html=True,
+            encoding="utf-8" if utf8 else None,
+        )
+        # Errors found so far. These are only raised once the whole document has been
+        # scanned without finding a success message.
+        errors = set()
 
-        # Check if we have the login page, specified by the presence of an h3 with
-        # specific text.
-        if navigator.find("h3", text="Accessing private documents"):
+        try:
+            for _, element in events:
+                # Accept if the page reports a successful modification. Tails are only
+                # known once the parent ends.
+                if any(
+                    text is not None and _UPDATE_SUCCESS_TEXT in text
+                    for text in [element.text] + [child.tail for child in element]
+                ):
+                    return
+
+                if element.tag == "h3":
+                    if _normalized_text(element) == _LOGIN_PAGE_TEXT:
+                        errors.add(NotLoggedInError)
+                elif element.tag == "strong":
+                    if _normalized_text(element) == _DEFAULT_PAGE_TEXT:
+                        errors.add(UnrecognisedDCCRecordError)
+                elif element.tag == "dd" and _is_error_message(element):
+                    message = _all_text(element)
+
+                    if _UPDATE_INVALID_TEXT in message:
+                        errors.add(ValueError)
+
+                    if _UPDATE_UNAUTHORISED_TEXT in message:
+                        errors.add(UnauthorisedError)
+        except etree.XMLSyntaxError:
+            # The document is empty.
+            pass
+
+        # Check if we have the login page.
+        if NotLoggedInError in errors:
             raise NotLoggedInError()
 
         # Check if we have the default page (DCC redirects here for all unrecognised
         # requests).
-        if navigator.find("strong", text="Search for Documents by"):
+        if UnrecognisedDCCRecordError in errors:
             raise UnrecognisedDCCRecordError()
 
-        # Check if we have the error page.
-        if navigator.find("dt", class_="Error"):
-            # We have an error, but what is its message?
-            if navigator.find("dd", text=re.compile(".* is invalid.*")):
-                # Record number not valid.
-                raise ValueError("record number not valid")
-            if navigator.find("dd", text=re.compile(".* is not modifiable by user.*")):
-                # Unauthorised to update.
-                raise UnauthorisedError()
+        if ValueError in errors:
+            # Record number not valid.
+            raise ValueError("record number not valid")
+
+        if UnauthorisedError in errors:
+            # Unauthorised to update.
+            raise UnauthorisedError()
 
         raise Exception("Invalid XML update document")
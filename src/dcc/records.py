@@ -1,22 +1,141 @@
 """Record objects."""
 
+import os
+import re
 import logging
+import json
+import struct
+import sys
 from typing import List
 from pathlib import Path
 import shutil
-from dataclasses import dataclass, field, asdict
-from itertools import takewhile
-from functools import total_ordering, wraps
+from stat import S_ISREG
+from dataclasses import dataclass, field
+from functools import lru_cache, partial, total_ordering, wraps
+from concurrent.futures import ThreadPoolExecutor
 import datetime
-import tomli
-import tomli_w
+from . import env
 from .sessions import default_session
 from .parsers import DCCXMLRecordParser, DCCXMLUpdateParser
-from .util import opened_file, remove_none
+from .util import opened_file
+from . import _toml
 from .exceptions import NoVersionError, TooLargeFileSkippedException
 
 LOGGER = logging.getLogger(__name__)
 
+# DCC number strings, with optional "LIGO-" prefix and version suffix (the category is
+# validated separately).
+_DCC_NUMBER_PATTERN = re.compile(r"(?:LIGO-)?(.)(\d+)(?:-[vx](\d+))?")
+
+# Options for record dataclasses. Slots make instances smaller and their attributes
+# faster to access, where supported (Python 3.10+). On older Pythons instances still
+# have a `__dict__` and accept arbitrary attributes, so nothing may rely on the slots
+# for correctness; they are only an optimisation.
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Buffer size for downloading and copying files, large enough that the (often small)
+# downloaded chunks are written with few system calls.
+_FILE_BUFFER_SIZE = 256 * 1024
+
+
+def _stat(path):
+    """The status of `path`, or None if it doesn't exist."""
+    try:
+        return path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+# Header of record metadata cache files, identifying the metadata file they were created
+# from by its modification time, size and inode.
+_META_CACHE_HEADER = struct.Struct("<QQQ")
+
+
+def _encode_meta_cache_value(value):
+    """JSON representation of TOML values that JSON can't represent itself."""
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"__time__": value.isoformat()}
+
+    raise TypeError(f"Cannot cache {type(value).__name__} value {value!r}")
+
+
+def _decode_meta_cache_object(item):
+    """Inverse of :func:`_encode_meta_cache_value` for decoded JSON objects."""
+    if len(item) == 1:
+        ((key, value),) = item.items()
+
+        if key == "__datetime__":
+            return datetime.datetime.fromisoformat(value)
+        if key == "__date__":
+            return datetime.date.fromisoformat(value)
+        if key == "__time__":
+            return datetime.time.fromisoformat(value)
+
+    return item
+
+
+@lru_cache(maxsize=1024)
+def _read_meta(path, mtime_ns, size, inode):
+    """Parsed TOML metadata at `path`.
+
+    The file's modification time, size and inode identify its contents for the cache,
+    so changed (or atomically replaced) files are parsed again. If enabled, parsed
+    metadata is also cached on disk for later processes, as JSON (which, unlike e.g.
+    pickle, is safe to load from an archive that others can write to).
+    """
+    if not env.RECORD_CACHE:
+        return _toml.loads(path.read_bytes())
+
+    cache_path = path.parent / f".{path.name}.cache"
+    header = _META_CACHE_HEADER.pack(mtime_ns, size, inode)
+
+    try:
+        cached = cache_path.read_bytes()
+    except OSError:
+        pass
+    else:
+        if cached.startswith(header):
+            try:
+                return json.loads(
+                    cached[len(header) :], object_hook=_decode_meta_cache_object
+                )
+            except Exception as err:
+                LOGGER.debug(f"Ignoring invalid metadata cache {cache_path}: {err}")
+
+    item = _toml.loads(path.read_bytes())
+
+    # Write the cache atomically, like the metadata itself.
+    cache_path_tmp = path.parent / f".{path.name}.cache-tmp"
+    try:
+        content = json.dumps(item, default=_encode_meta_cache_value).encode("utf-8")
+        cache_path_tmp.write_bytes(header + content)
+        cache_path_tmp.replace(cache_path)
+    except OSError as err:
+        # The archive may be read-only, which is fine.
+        LOGGER.debug(f"Could not write metadata cache {cache_path}: {err}")
+
+    return item
+
+
+@lru_cache(maxsize=4096)
+def _revision_paths(archive_dir, document_name, revision_name):
+    """The directory and meta file paths of a revision in an archive.
+
+    These are looked up for the same revisions repeatedly when fetching and archiving
+    records, so are cached. Paths are immutable, so can safely be shared.
+    """
+    revision_dir = archive_dir / document_name / revision_name
+    return revision_dir, revision_dir / "meta.toml"
+
+
+def _without_none(fields):
+    """The `fields` dict without None values, which TOML can't serialise."""
+    return {key: value for key, value in fields.items() if value is not None}
+
 
 def ensure_session(func):
     """Ensure the `session` argument passed to the wrapped function is real, creating a
@@ -61,15 +180,29 @@ class DCCArchive:
         :class:`.DCCNumber`
             A DCC number in the local archive.
         """
-        for path in self.archive_dir.iterdir():
-            if not path.is_dir():
-                continue
+        for document, _ in self._iter_documents():
+            yield document
+
+    def _iter_documents(self):
+        """Yield the DCC number and directory path of each document in the archive."""
+        # Use scandir, which avoids a stat call per entry to determine if it's a
+        # directory.
+        with os.scandir(self.archive_dir) as entries:
+            for entry in entries:
+                # Cheaply skip other files and directories by name first.
+                if _DCC_NUMBER_PATTERN.fullmatch(entry.name) is None:
+                    continue
 
-            try:
-                yield DCCNumber(path.name)
-            except Exception:
-                # Not a valid DCC number.
-                pass
+                if not entry.is_dir():
+                    continue
+
+                try:
+                    document = DCCNumber.parse(entry.name)
+                except Exception:
+                    # Not a valid DCC number.
+                    continue
+
+                yield document, entry.path
 
     @property
     def records(self):
@@ -80,9 +213,26 @@ class DCCArchive:
         :class:`.DCCRecord`
             A record in the archive.
         """
-        for document in self.documents:
-            path = self.document_dir(document)
-            yield from self.revisions(path.name)
+        return self._iter_records(DCCRecord.read)
+
+    @property
+    def shallow_records(self):
+        """Records in the local archive, including revisions, with all but their DCC
+        numbers and titles built only when first accessed.
+
+        Yields
+        ------
+        :class:`._ShallowDCCRecord`
+            A record in the archive.
+        """
+        return self._iter_records(DCCRecord.read_shallow)
+
+    def _iter_records(self, read):
+        # Scan each document directory found by the archive directory scan directly,
+        # rather than looking up each document's directory again.
+        for _, document_path in self._iter_documents():
+            for _, meta_path in self._iter_revision_dir(document_path):
+                yield read(meta_path)
 
     @property
     def latest_revisions(self):
@@ -111,6 +261,7 @@ class DCCArchive:
         overwrite=False,
         fetch_files=False,
         ignore_too_large=False,
+        max_workers=1,
         session,
     ):
         """Fetch a DCC record, either from the local archive or from the remote DCC
@@ -136,6 +287,11 @@ class DCCArchive:
             If False, when a file is too large, raise a
             :class:`.TooLargeFileSkippedException`. If True, the file is simply ignored.
 
+        max_workers : int, optional
+            The maximum number of files to fetch concurrently if `fetch_files` is
+            True, or None to use up to one thread per pooled session connection.
+            Defaults to 1, fetching files one at a time.
+
         session : :class:`.DCCSession`, optional
             The DCC session to use. Defaults to None, which triggers use of the default
             session settings.
@@ -200,6 +356,7 @@ class DCCArchive:
                 record,
                 ignore_too_large=ignore_too_large,
                 overwrite=overwrite,
+                max_workers=max_workers,
                 session=session,
             )
 
@@ -207,7 +364,7 @@ class DCCArchive:
 
     @ensure_session
     def fetch_record_files(
-        self, record, *, ignore_too_large=False, overwrite=False, session
+        self, record, *, ignore_too_large=False, overwrite=False, max_workers=1, session
     ):
         """Fetch the files in the specified DCC record. If any file does not exist in
         the local archive, it is fetched and archived from the DCC.
@@ -225,6 +382,11 @@ class DCCArchive:
             Whether to overwrite existing local files with those fetched remotely.
             Defaults to False.
 
+        max_workers : int, optional
+            The maximum number of files to fetch concurrently, or None to use up to one
+            thread per pooled session connection. Defaults to 1, fetching files one at
+            a time.
+
         session : :class:`.DCCSession`, optional
             The DCC session to use. Defaults to None, which triggers use of the default
             session settings.
@@ -238,6 +400,7 @@ class DCCArchive:
             self.revision_dir(record.dcc_number),
             ignore_too_large=ignore_too_large,
             overwrite=overwrite,
+            max_workers=max_workers,
             session=session,
         )
 
@@ -282,7 +445,7 @@ class DCCArchive:
             session=session,
         )
 
-    def archive_revision_metadata(self, record, *, overwrite=False):
+    def archive_revision_metadata(self, record, *, overwrite=False, verify=False):
         """Serialise revision metadata in the local archive.
 
         Parameters
@@ -293,6 +456,10 @@ class DCCArchive:
         overwrite : bool, optional
             If True, overwrite any existing revision in the local archive; otherwise
             do nothing. Defaults to False.
+
+        verify : bool, optional
+            Check the serialised metadata can be parsed again before archiving it.
+            Defaults to False.
         """
         meta_path = self.revision_meta_path(record.dcc_number)
 
@@ -306,6 +473,11 @@ class DCCArchive:
 
             LOGGER.info(f"Overwriting {meta_path}")
 
+        content = record._serialise()
+
+        if verify:
+            _toml.loads(content)
+
         LOGGER.info(f"Archiving {record} metadata to {meta_path}.")
         meta_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -314,9 +486,55 @@ class DCCArchive:
         # Just create a new file directly (don't use `tempfile`) so that the new
         # temporary file has the target directory's intended mode.
         meta_path_tmp = meta_path.parent / f".{meta_path.name}-tmp"
-        record.write(meta_path_tmp)
-        # NOTE: remove str() for Python >= 3.9.
-        shutil.move(str(meta_path_tmp), str(meta_path))  # Atomic when dirs match.
+        meta_path_tmp.write_bytes(content)
+        meta_path_tmp.replace(meta_path)  # Atomic as the directories match.
+
+    def iter_revisions(self, dcc_number):
+        """Revisions in the local archive corresponding to the specified DCC number,
+        without reading them.
+
+        Parameters
+        ----------
+        dcc_number : :class:`.DCCNumber` or str
+            The DCC number. If a version is specified, it is ignored.
+
+        Yields
+        ------
+        :class:`.DCCNumber`
+            The versioned DCC number of a revision in the local archive, determined from
+            its directory name.
+
+        :class:`pathlib.Path`
+            The path to the revision's meta file.
+        """
+        dcc_number = DCCNumber(dcc_number)
+        yield from self._iter_revision_dir(self.document_dir(dcc_number))
+
+    def _iter_revision_dir(self, document_dir):
+        """Yield the DCC number and meta file path of each revision in the document
+        directory `document_dir`."""
+        try:
+            entries = os.scandir(document_dir)
+        except FileNotFoundError:
+            return
+
+        with entries:
+            for entry in entries:
+                # Cheaply skip files and directories not named like revisions first.
+                match = _DCC_NUMBER_PATTERN.fullmatch(entry.name)
+                if match is None or match.group(3) is None:
+                    continue
+
+                if not entry.is_dir():
+                    continue
+
+                try:
+                    revision = DCCNumber.parse(entry.name)
+                except ValueError:
+                    # Not a revision directory.
+                    continue
+
+                yield revision, self._meta_path(Path(entry.path))
 
     def revisions(self, dcc_number):
         """All revisions in the local archive corresponding to the specified DCC number.
@@ -332,25 +550,15 @@ class DCCArchive:
             The :class:`records <.DCCRecord>` in the local archive corresponding to the
             revisions of `dcc_number`.
         """
-        dcc_number = DCCNumber(dcc_number)
-        document_dir = self.document_dir(dcc_number)
-
-        revisions = []
-
-        if document_dir.exists():
-            for revision_path in document_dir.iterdir():
-                if not revision_path.is_dir():
-                    continue
-
-                # Parse the revision if exists.
-                revisions.append(DCCRecord.read(self._meta_path(revision_path)))
-
-        return revisions
+        revisions = self.iter_revisions(dcc_number)
+        return [DCCRecord.read(meta_path) for _, meta_path in revisions]
 
     def latest_revision(self, dcc_number):
         """The latest revision in the local archive of the document corresponding to the
         specified DCC number.
 
+        Only the latest revision's meta file is read.
+
         Parameters
         ----------
         dcc_number : :class:`.DCCNumber` or str
@@ -366,15 +574,19 @@ class DCCArchive:
         :class:`FileNotFoundError`
             If no revisions of `dcc_number` exist in the local archive.
         """
-        records = self.revisions(dcc_number)
         try:
-            # Return the record with the latest version.
-            return max(records, key=lambda record: record.dcc_number)
+            # Find the revision with the latest version.
+            _, meta_path = max(
+                self.iter_revisions(dcc_number),
+                key=lambda revision: revision[0].version,
+            )
         except ValueError:
             raise FileNotFoundError(
                 f"No locally archived records exist for {dcc_number}."
             )
 
+        return DCCRecord.read(meta_path)
+
     def document_dir(self, dcc_number):
         """The directory in the local archive of the document corresponding to the
         specified DCC number.
@@ -416,12 +628,7 @@ class DCCArchive:
         :class:`.NoVersionError`
             If `dcc_number` does not contain a version.
         """
-        # We require a version.
-        if dcc_number.version is None:
-            raise NoVersionError()
-
-        document_path = self.document_dir(dcc_number)
-        return document_path / dcc_number.format(version=True)
+        return self._revision_paths_for(dcc_number)[0]
 
     def revision_meta_path(self, dcc_number):
         """The path to the meta file in the local archive of the revision corresponding
@@ -445,13 +652,25 @@ class DCCArchive:
         :class:`.NoVersionError`
             If `dcc_number` does not contain a version.
         """
-        return self._meta_path(self.revision_dir(dcc_number))
+        return self._revision_paths_for(dcc_number)[1]
+
+    def _revision_paths_for(self, dcc_number):
+        """The revision directory and meta file path of `dcc_number`."""
+        # We require a version.
+        if dcc_number.version is None:
+            raise NoVersionError()
+
+        return _revision_paths(
+            self.archive_dir,
+            dcc_number.format(version=False),
+            dcc_number.format(version=True),
+        )
 
     def _meta_path(self, directory):
         return directory / "meta.toml"
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DCCAuthor:
     """A DCC author."""
 
@@ -462,12 +681,20 @@ class DCCAuthor:
     def __str__(self):
         return self.name
 
+    def _to_dict(self):
+        """The author's set fields."""
+        return _without_none(
+            {"name": self.name, "uid": self.uid, "authorid": self.authorid}
+        )
+
 
-@dataclass
+@dataclass(frozen=True)
 @total_ordering
 class DCCNumber:
     """A DCC number including category and numeric identifier.
 
+    Numbers are immutable, so can be shared and used as dictionary keys.
+
     You must either provide a string containing the DCC number, or the separate category
     and numeric parts, with optional version, e.g.:
 
@@ -517,42 +744,25 @@ class DCCNumber:
                 pass
             category = category.category
         elif numeric is None:
-            # Full number specified in the first argument. Check it's long enough.
-            if len(category) < 2:
+            # Full number specified in the first argument.
+            match = _DCC_NUMBER_PATTERN.fullmatch(category)
+
+            if match is None:
                 raise ValueError(
                     f"Invalid DCC number {repr(category)}; should be of the form "
                     f"'T0123456'"
                 )
 
-            # Get rid of first "LIGO-" if present.
-            if category.startswith("LIGO-"):
-                category = category[len("LIGO-") :]
-
-            try:
-                # Find where the hyphen denoting the version is.
-                hyphen_index = category.index("-")
-            except ValueError:
-                # Couldn't find it.
-                hyphen_index = None
+            category, numeric, string_version = match.groups()
 
-            if hyphen_index is not None:
+            if string_version is not None:
                 # Check if the version was specified, and if so, warn the user.
                 if version is not None:
                     LOGGER.warning(
                         "Version argument ignored as it was specified in the DCC string"
                     )
 
-                # Numeric part is between second character and index.
-                numeric = category[1:hyphen_index]
-
-                # Version is last part, two places beyond start of hyphen.
-                version = category[hyphen_index + 2 :]
-            else:
-                # Numeric is everything after first character.
-                numeric = category[1:]
-
-            # Category should be first.
-            category = category[0]
+                version = string_version
 
         # Check category is valid.
         category = str(category)
@@ -572,9 +782,50 @@ class DCCNumber:
 
             version = int(version)
 
-        self.category = category
-        self.numeric = numeric
-        self.version = version
+        # These are used often, e.g. to build archive paths, so build them once.
+        if version is None:
+            version_suffix = ""
+        elif version == 0:
+            # Version 0 should end "x0", otherwise "v1" etc.
+            version_suffix = "-x0"
+        else:
+            version_suffix = f"-v{version}"
+
+        unversioned_string = f"{category}{numeric}"
+
+        # The number is frozen, so its attributes can only be set this way.
+        set_ = partial(object.__setattr__, self)
+        set_("category", category)
+        set_("numeric", numeric)
+        set_("version", version)
+        set_("_version_suffix", version_suffix)
+        set_("_unversioned_string", unversioned_string)
+        set_("_string", unversioned_string + version_suffix)
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def parse(cls, string):
+        """Parse DCC number string, reusing the result of previous identical calls.
+
+        Numbers are immutable, so can be shared. This is useful when the same strings
+        are parsed repeatedly, e.g. when scanning the local archive.
+
+        Parameters
+        ----------
+        string : str
+            The DCC number, with optional version, e.g. "T1234567" or "T1234567-v2".
+
+        Returns
+        -------
+        :class:`.DCCNumber`
+            The DCC number.
+
+        Raises
+        ------
+        :class:`ValueError`
+            If `string` is not a valid DCC number.
+        """
+        return cls(string)
 
     def format(self, version=True):
         """String representation of the DCC number, with optional version number.
@@ -589,8 +840,7 @@ class DCCNumber:
         str
             The string representation.
         """
-        version_string = self.version_suffix if version else ""
-        return f"{self.category}{self.numeric}{version_string}"
+        return self._string if version else self._unversioned_string
 
     @property
     def version_suffix(self):
@@ -601,25 +851,33 @@ class DCCNumber:
         str
             The version suffix to the DCC numeral, e.g. "-v2".
         """
-        # Version 0 should end "x0", otherwise "v1" etc.
-        if self.version is None:
-            return ""
-        elif self.version == 0:
-            return "-x0"
-        else:
-            return f"-v{self.version}"
+        return self._version_suffix
 
     def __str__(self):
-        return self.format(version=True)
+        return self._string
+
+    def __hash__(self):
+        return hash(self._string)
+
+    def _to_dict(self):
+        """The number's set fields."""
+        item = {"category": self.category, "numeric": self.numeric}
+
+        if self.version is not None:
+            item["version"] = self.version
+
+        return item
 
     def __eq__(self, other):
+        if isinstance(other, DCCNumber):
+            # The string uniquely represents the category, numeric and version.
+            return self._string == other._string
+
         try:
-            return all(
-                (
-                    self.category == other.category,
-                    self.numeric == other.numeric,
-                    self.version == other.version,
-                )
+            return (
+                self.category == other.category
+                and self.numeric == other.numeric
+                and self.version == other.version
             )
         except Exception:
             return NotImplemented
@@ -628,16 +886,13 @@ class DCCNumber:
         if self.version is None or other.version is None:
             return NotImplemented
 
-        return all(
-            (
-                self.category == other.category,
-                self.numeric == other.numeric,
-                self.version > other.version,
-            )
+        return (
+            self._unversioned_string == other._unversioned_string
+            and self.version > other.version
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DCCFile:
     """A DCC file."""
 
@@ -656,6 +911,12 @@ class DCCFile:
 
         return f"{self.title} ({self.filename})"
 
+    def _to_dict(self):
+        """The file's set fields, without the local path."""
+        return _without_none(
+            {"title": self.title, "filename": self.filename, "url": self.url}
+        )
+
     @ensure_session
     def fetch(self, directory, *, overwrite=False, session):
         """Fetch the remote file and store in the local archive.
@@ -673,26 +934,30 @@ class DCCFile:
             The DCC session to use. Defaults to None, which triggers use of the default
             session settings.
         """
-        file_path = Path(directory / self.filename)
+        file_path = Path(directory, self.filename)
+        file_dir = file_path.parent
+        # Check for an existing file with a single stat call.
+        file_stat = _stat(file_path)
 
-        if not overwrite and file_path.exists():
+        if not overwrite and file_stat is not None:
             # The file is available in the local archive.
             LOGGER.info(f"{file_path} already exists.")
+            is_file = S_ISREG(file_stat.st_mode)
         else:
             # Fetch the remote file.
             LOGGER.info(f"Fetching {self} from DCC")
 
-            if file_path.exists():
+            if file_stat is not None:
                 LOGGER.info(f"Overwriting {file_path}")
             else:
-                file_path.parent.mkdir(parents=True, exist_ok=True)
+                file_dir.mkdir(parents=True, exist_ok=True)
 
             # First fetch the file from the DCC to a temporary file in the same
             # directory, then move it to the final location, to ensure atomicity.
             # Just create a new file directly (don't use `tempfile`) so that the new
             # temporary file has the target directory's intended mode.
-            file_path_tmp = file_path.parent / f".{file_path.name}-tmp"
-            with file_path_tmp.open("w+b") as fobj:
+            file_path_tmp = file_dir / f".{file_path.name}-tmp"
+            with file_path_tmp.open("wb", buffering=_FILE_BUFFER_SIZE) as fobj:
                 # Get the file contents from the DCC.
                 LOGGER.info(f"Downloading {self}")
                 for chunk in session.fetch_file_contents(self):
@@ -700,10 +965,13 @@ class DCCFile:
 
             # Move to the final location.
             LOGGER.info(f"Saving {self} to {file_path}")
-            # NOTE: remove str() for Python >= 3.9.
-            shutil.move(str(file_path_tmp), str(file_path))  # Atomic when dirs match.
+            file_path_tmp.replace(file_path)  # Atomic as the directories match.
+            is_file = True
 
-        self.discover(directory)
+        if is_file:
+            # No need to discover the file again.
+            LOGGER.debug(f"{self} local file is at {file_path}.")
+            self.local_path = file_path
 
     def write(self, path):
         """Write file to the file system.
@@ -718,9 +986,15 @@ class DCCFile:
         if self.local_path is None:
             raise FileNotFoundError(f"No known local copy of {self}.")
 
-        # Copy, allowing for open file objects.
+        if isinstance(path, (str, Path)):
+            # Let the operating system copy the file directly where it can (e.g. with
+            # sendfile on Linux).
+            shutil.copyfile(self.local_path, path)
+            return
+
+        # Copy to the open file object.
         with opened_file(self.local_path, "rb") as src, opened_file(path, "wb") as dst:
-            shutil.copyfileobj(src, dst)
+            shutil.copyfileobj(src, dst, _FILE_BUFFER_SIZE)
 
     def discover(self, directory):
         """Update local file path if the local file exists in `directory`.
@@ -730,7 +1004,7 @@ class DCCFile:
         directory : :class:`str` or :class:`pathlib.Path`
             The directory to search.
         """
-        path = Path(directory / self.filename)
+        path = Path(directory, self.filename)
         if path.is_file():
             LOGGER.debug(f"Discovered {self} local file at {path}.")
             self.local_path = path
@@ -749,7 +1023,7 @@ class DCCFile:
         return self.local_path.is_file()
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DCCJournalRef:
     """A DCC record journal reference."""
 
@@ -767,8 +1041,20 @@ class DCCJournalRef:
 
         return f"{journal} vol. {volume}, pg. {page}{url}"
 
+    def _to_dict(self):
+        """The reference's set fields."""
+        return _without_none(
+            {
+                "journal": self.journal,
+                "volume": self.volume,
+                "page": self.page,
+                "citation": self.citation,
+                "url": self.url,
+            }
+        )
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class DCCRecord:
     """A DCC record."""
 
@@ -798,9 +1084,13 @@ class DCCRecord:
         self.other_versions = list(self.other_versions or [])
         self.files = list(self.files or [])
         # Ensure referencing documents don't include this one.
-        pred = lambda number: number.numeric != self.dcc_number.numeric
-        self.referenced_by = list(takewhile(pred, self.referenced_by or []))
-        self.related_to = list(takewhile(pred, self.related_to or []))
+        own = self.dcc_number.numeric
+        self.referenced_by = [
+            number for number in self.referenced_by or [] if number.numeric != own
+        ]
+        self.related_to = [
+            number for number in self.related_to or [] if number.numeric != own
+        ]
 
     @classmethod
     @ensure_session
@@ -893,12 +1183,33 @@ class DCCRecord:
         directory : :class:`str` or :class:`pathlib.Path`
             The directory to search.
         """
+        if not self.files:
+            return
+
+        directory = Path(directory)
+
+        # List the directory once rather than checking for each file.
+        try:
+            with os.scandir(directory) as entries:
+                present = {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            return
+
         for file_ in self.files:
-            file_.discover(directory)
+            if file_.filename in present:
+                path = directory / file_.filename
+                LOGGER.debug(f"Discovered {file_} local file at {path}.")
+                file_.local_path = path
 
     @ensure_session
     def fetch_files(
-        self, directory, *, ignore_too_large=False, overwrite=False, session
+        self,
+        directory,
+        *,
+        ignore_too_large=False,
+        overwrite=False,
+        max_workers=1,
+        session,
     ):
         """Fetch files attached to this record.
 
@@ -915,6 +1226,12 @@ class DCCRecord:
             Whether to overwrite existing local files with those fetched remotely.
             Defaults to False.
 
+        max_workers : int, optional
+            The maximum number of files to fetch concurrently, over the session's
+            pooled connections. If None, files are fetched concurrently using up to one
+            thread per pooled connection. Defaults to 1, fetching files one at a time,
+            as is required if the session's stream hook interacts with the user.
+
         session : :class:`.DCCSession`, optional
             The DCC session to use. Defaults to None, which triggers use of the default
             session settings.
@@ -924,19 +1241,38 @@ class DCCRecord:
         list
             The fetched :class:`files <.DCCFile>`.
         """
-        files = []
-        for index in range(len(self.files)):
-            files.append(
-                self.fetch_file(
-                    index + 1,
-                    directory,
-                    ignore_too_large=ignore_too_large,
-                    overwrite=overwrite,
-                    session=session,
-                )
-            )
+        numbers = range(1, len(self.files) + 1)
+        fetch = partial(
+            self.fetch_file,
+            directory=directory,
+            ignore_too_large=ignore_too_large,
+            overwrite=overwrite,
+            session=session,
+        )
+
+        if max_workers is None:
+            max_workers = min(len(numbers), session.max_connections)
+
+        if max_workers > 1 and len(numbers) > 1:
+            # Files with the same name are stored at the same path, so fetch them one
+            # at a time, in order, as they would be without concurrency.
+            groups = {}
+            for number in numbers:
+                groups.setdefault(self.files[number - 1].filename, []).append(number)
+
+            fetched = {}
+
+            def fetch_group(group):
+                for number in group:
+                    fetched[number] = fetch(number)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Consume the results to raise any errors.
+                list(executor.map(fetch_group, groups.values()))
 
-        return files
+            return [fetched[number] for number in numbers]
+
+        return [fetch(number) for number in numbers]
 
     @ensure_session
     def fetch_file(
@@ -999,38 +1335,123 @@ class DCCRecord:
         # Parse the document (exceptions to be handled by calling code).
         DCCXMLUpdateParser(response.text)
 
-    def write(self, path):
+    def write(self, path, *, verify=False):
         """Write record to the file system.
 
         Parameters
         ----------
         path : str, :class:`pathlib.Path`, or file-like
             The path or file object to write to. If an open file object is given, it
-            will be written to and left open. If a path string is given, it will be
-            opened, written to, then closed.
+            will be written to and left open. If a path is given, the record is written
+            to a temporary file in the same directory which then replaces it.
+
+        verify : bool, optional
+            Check the serialised metadata can be parsed again before writing it.
+            Defaults to False.
         """
-        # Create a metadata dict.
-        item = dict(__schema__="1")  # Do this first so it's at the top of the file.
-        itemdict = asdict(self)
-        # Strip out None values, which TOML can't serialise.
-        itemdict = remove_none(itemdict)
-        item.update(itemdict)
+        content = self._serialise()
+
+        if verify:
+            # This checks the serialised content directly rather than reading the file
+            # back.
+            _toml.loads(content)
+
+        if isinstance(path, (str, Path)):
+            path = Path(path)
+            # Replace rather than overwrite the file, so that it gets a new inode and
+            # parsed metadata cached for the old file (see _read_meta) isn't used even
+            # if its modification time and size are unchanged.
+            path_tmp = path.parent / f".{path.name}-tmp"
+            path_tmp.write_bytes(content)
+            path_tmp.replace(path)
+        else:
+            with opened_file(path, "wb") as fobj:
+                fobj.write(content)
+
+    def _to_dict(self):
+        """The record's set fields, as :func:`dataclasses.asdict` would give them but
+        without None values (which TOML can't serialise) and the local paths of files
+        (which can be reproduced from other data).
 
-        # Apply some corrections.
-        for number, file_ in enumerate(item["files"]):
-            # Remove fields that can be reproduced from other data.
-            file_.pop("local_path", None)
+        Unlike :func:`dataclasses.asdict`, this does not deep copy values.
+        """
+        journal_reference = self.journal_reference
+
+        if journal_reference is not None:
+            journal_reference = journal_reference._to_dict()
+
+        keywords = self.keywords
+
+        if keywords is not None:
+            # Empty keywords are parsed as None, which TOML can't serialise either.
+            keywords = [keyword for keyword in keywords if keyword is not None]
+
+        return _without_none(
+            {
+                "dcc_number": self.dcc_number._to_dict(),
+                "title": self.title,
+                "authors": [author._to_dict() for author in self.authors],
+                "abstract": self.abstract,
+                "keywords": keywords,
+                "note": self.note,
+                "publication_info": self.publication_info,
+                "journal_reference": journal_reference,
+                "other_versions": [
+                    version for version in self.other_versions if version is not None
+                ],
+                "creation_date": self.creation_date,
+                "contents_revision_date": self.contents_revision_date,
+                "metadata_revision_date": self.metadata_revision_date,
+                "files": [file_._to_dict() for file_ in self.files],
+                "referenced_by": [number._to_dict() for number in self.referenced_by],
+                "related_to": [number._to_dict() for number in self.related_to],
+            }
+        )
 
-        with opened_file(path, "wb") as fobj:
-            tomli_w.dump(item, fobj, multiline_strings=True)
+    def _serialise(self):
+        """The record's TOML metadata, encoded as bytes."""
+        # Create a metadata dict.
+        item = dict(__schema__="1")  # Do this first so it's at the top of the file.
+        item.update(self._to_dict())
 
-        # Verification: check the file can be parsed again.
-        assert self.read(path)
+        return _toml.dumps(item).encode("utf-8")
 
     @classmethod
     def read(cls, path):
         """Read record from the file system.
 
+        Parameters
+        ----------
+        path : str, :class:`pathlib.Path`, or file-like
+            The path for the record's meta file, or the meta file opened in binary
+            mode. Local copies of the record's files are only discovered when a path is
+            given.
+
+        Returns
+        -------
+        :class:`.DCCRecord`
+            The record.
+        """
+        if not isinstance(path, (str, Path)):
+            with opened_file(path, "rb") as fobj:
+                item = _toml.loads(fobj.read())
+
+            # Check the file came from us.
+            assert item["__schema__"] == "1", "Unsupported schema"
+
+            return cls._from_meta(None, item)
+
+        path = Path(path)
+        return cls._from_meta(path, cls._read_checked_meta(path))
+
+    @classmethod
+    def read_shallow(cls, path):
+        """Read record from the file system, deferring building most of its fields.
+
+        Only the record's DCC number and title are available straight away. The full
+        record is built when any other attribute is first accessed. This is useful for
+        e.g. listing many records by title.
+
         Parameters
         ----------
         path : str or :class:`pathlib.Path`
@@ -1038,17 +1459,34 @@ class DCCRecord:
 
         Returns
         -------
-        :class:`.DCCRecord`
+        :class:`._ShallowDCCRecord`
             The record.
         """
         path = Path(path)
+        return _ShallowDCCRecord(path, cls._read_checked_meta(path))
 
-        with path.open("rb") as fobj:
-            LOGGER.debug(f"Reading metadata from {path}.")
-            item = tomli.load(fobj)
+    @staticmethod
+    def _read_checked_meta(path):
+        """The (possibly cached) parsed metadata at `path`, checked to be ours."""
+        LOGGER.debug(f"Reading metadata from {path}.")
+        stat = path.stat()
+        item = _read_meta(path, stat.st_mtime_ns, stat.st_size, stat.st_ino)
 
         # Check the file came from us.
         assert item["__schema__"] == "1", "Unsupported schema"
+
+        return item
+
+    @classmethod
+    def _from_meta(cls, path, item):
+        """Build record from parsed metadata read from `path`, or from a file object if
+        `path` is None."""
+        # Copy the (possibly cached) metadata and its lists, so the record doesn't
+        # share them.
+        item = {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in item.items()
+        }
         item.pop("__schema__", None)
 
         item["dcc_number"] = DCCNumber(**item["dcc_number"])
@@ -1057,14 +1495,21 @@ class DCCRecord:
         if "journal_reference" in item:
             item["journal_reference"] = DCCJournalRef(**item["journal_reference"])
         if "files" in item:
+            # Find downloaded files with one directory listing rather than checking
+            # for each file in turn.
+            if path is None:
+                present = set()
+            else:
+                with os.scandir(path.parent) as entries:
+                    present = {entry.name for entry in entries if entry.is_file()}
+
             files = []
             for filedata in item["files"]:
                 file_ = DCCFile(**filedata)
 
                 # Update local path if the file has been downloaded.
-                local_path = path.parent / file_.filename
-                if local_path.is_file():
-                    file_.local_path = local_path
+                if file_.filename in present:
+                    file_.local_path = path.parent / file_.filename
 
                 files.append(file_)
             item["files"] = files
@@ -1121,7 +1566,8 @@ class DCCRecord:
             The latest version number.
         """
 
-        return max(self.version_numbers)
+        # Avoid building the set of version numbers.
+        return max((self.dcc_number.version, *self.other_versions))
 
     def is_latest_version(self):
         """Check if the current record is the latest version.
@@ -1134,7 +1580,8 @@ class DCCRecord:
         :class:`bool`
             True if the current version is the latest; False otherwise.
         """
-        return self.dcc_number.version is self.latest_version_number
+        # Compare by value: only small integers are guaranteed to be identical objects.
+        return self.dcc_number.version == self.latest_version_number
 
     def refenced_by_titles(self):
         """The titles of the records referencing this record.
@@ -1155,3 +1602,40 @@ class DCCRecord:
             The titles.
         """
         return [str(record) for record in self.related]
+
+
+class _ShallowDCCRecord:
+    """A record read from the file system, with all but its DCC number and title built
+    only when first accessed.
+
+    Parameters
+    ----------
+    path : :class:`pathlib.Path`
+        The path for the record's meta file.
+
+    item : :class:`dict`
+        The record's parsed metadata.
+    """
+
+    def __init__(self, path, item):
+        self._path = path
+        self._item = item
+        self._record = None
+        self.dcc_number = DCCNumber(**item["dcc_number"])
+        self.title = item.get("title")
+
+    def __getattr__(self, name):
+        # Only called for attributes not set above.
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if self._record is None:
+            self._record = DCCRecord._from_meta(self._path, self._item)
+
+        return getattr(self._record, name)
+
+    def __str__(self):
+        return f"{self.dcc_number}: {repr(self.title)}"
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.dcc_number}>"
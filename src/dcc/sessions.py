@@ -2,12 +2,18 @@
 
 import abc
 import logging
-from requests import Session
+import re
+from requests import Session, RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ciecplib import Session as CIECPSession
 from .env import DEFAULT_HOST, DEFAULT_IDP
 
 LOGGER = logging.getLogger(__name__)
 
+# An author's first name and the rest of their name.
+_FIRST_NAME_PATTERN = re.compile(r"^(\S+) (.*)$")
+
 
 def default_session(authenticated=False):
     """Create a DCC session using the default host and identity provider.
@@ -28,6 +34,31 @@ def default_session(authenticated=False):
         return DCCUnauthenticatedSession(host=DEFAULT_HOST)
 
 
+def _authors_form_value(authors):
+    """The authors form field value for `authors`, or None if there are none."""
+    if not authors:
+        return None
+
+    # Put first names at the end following a comma, with whitespace collapsed to single
+    # spaces. Single names are left as-is.
+    return "\n".join(
+        [
+            _FIRST_NAME_PATTERN.sub(r"\2, \1", " ".join(author.name.split()))
+            for author in authors
+        ]
+    )
+
+
+def _keywords_form_value(keywords):
+    """The keywords form field value for `keywords`, or None if there are none."""
+    return " ".join(keywords) if keywords else None
+
+
+def _references_form_value(dcc_numbers):
+    """The related documents form field value for `dcc_numbers`."""
+    return [dcc_number.format(version=False) for dcc_number in dcc_numbers]
+
+
 class DCCSession(metaclass=abc.ABCMeta):
     """A DCC HTTP fetcher.
 
@@ -40,7 +71,8 @@ class DCCSession(metaclass=abc.ABCMeta):
         Function taking a stream type, the item being streamed, and a
         :class:`requests.Response` object from a streamed GET or POST request, yielding
         its body content. This can be used to implement download progress bars,
-        interactive skipping of downloads, etc.
+        interactive skipping of downloads, etc. The content should be read in chunks of
+        :attr:`file_chunk_size` bytes.
     """
 
     # Transport protocol.
@@ -49,6 +81,38 @@ class DCCSession(metaclass=abc.ABCMeta):
     # Stream types.
     STREAM_FILE = 1
 
+    # Retries for failed connections and idempotent requests meeting transient server
+    # errors, with exponential backoff (in seconds) between them.
+    max_retries = 3
+    retry_backoff_factor = 0.3
+    retry_statuses = (502, 503, 504)
+
+    # Record attributes that can be updated, with the names of the form fields holding
+    # their values and update modes, and the function formatting the value for the
+    # form (if not the value itself).
+    _METADATA_FORM_FIELDS = (
+        ("title", "TitleField", "TitleChange", None),
+        ("abstract", "AbstractField", "AbstractChange", None),
+        ("keywords", "KeywordsField", "KeywordsChange", _keywords_form_value),
+        ("note", "NotesField", "NotesChange", None),
+        (
+            "related_to",
+            "RelatedDocumentsField",
+            "RelatedDocumentsChange",
+            _references_form_value,
+        ),
+        ("authors", "authormanual", "AuthorsChange", _authors_form_value),
+    )
+
+    # Maximum number of pooled connections kept open to the DCC host, e.g. for
+    # fetching files concurrently.
+    max_connections = 16
+
+    # Size of the chunks streamed file contents are read in. Iterating over responses
+    # directly gives tiny chunks, so this is large to keep the per-chunk overhead of
+    # downloading and writing files low.
+    file_chunk_size = 1024 * 1024
+
     def __init__(
         self,
         host,
@@ -61,11 +125,40 @@ class DCCSession(metaclass=abc.ABCMeta):
         if stream_hook is None:
 
             def stream_hook(_a, _b, response):
-                yield from response
+                yield from response.iter_content(chunk_size=self.file_chunk_size)
 
         self.host = host
         self.stream_hook = stream_hook
 
+        # Requests to the DCC host share pooled, keep-alive connections; retry those
+        # that fail transiently.
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.retry_backoff_factor,
+            status_forcelist=self.retry_statuses,
+            raise_on_status=False,
+        )
+        self.mount(
+            f"{self.protocol}://",
+            HTTPAdapter(max_retries=retry, pool_maxsize=self.max_connections),
+        )
+
+    def prime(self):
+        """Open a connection to the DCC host ahead of the first real request.
+
+        This allows the connection (and TLS) set up to be paid before e.g. a batch of
+        records is fetched, so the first fetch can reuse the pooled connection. Errors
+        are logged and otherwise ignored; they will resurface on the first real
+        request.
+        """
+        url = self._build_dcc_url()
+        LOGGER.debug(f"HEAD {url} to prime connection")
+
+        try:
+            self.head(url, allow_redirects=False)
+        except RequestException as err:
+            LOGGER.debug(f"Could not prime connection: {err}")
+
     def fetch_record_page(self, dcc_number):
         """Fetch a DCC record page.
 
@@ -140,41 +233,19 @@ class DCCSession(metaclass=abc.ABCMeta):
     def _build_dcc_metadata_form(self, dcc_record):
         """Build form data representing the specified metadata update."""
 
-        # Extract data from records.
-        related = [ref.format(version=False) for ref in dcc_record.related_to]
-
-        if dcc_record.authors:
-            reversed_authors = []
-            for author in dcc_record.authors:
-                # HACK: put first name at end following a comma. Is there a better way
-                # to do this?
-                name_pieces = author.name.split()
-                extra = " ".join(name_pieces[1:])
-                reversed_authors.append(f"{extra}, {name_pieces[0]}")
-            authors = "\n".join(reversed_authors)
-
-        if dcc_record.keywords:
-            keywords = " ".join(dcc_record.keywords)
-        else:
-            keywords = None
-
-        fields = [
-            (dcc_record.title, "TitleField", "TitleChange"),
-            (dcc_record.abstract, "AbstractField", "AbstractChange"),
-            (keywords, "KeywordsField", "KeywordsChange"),
-            (dcc_record.note, "NotesField", "NotesChange"),
-            (related, "RelatedDocumentsField", "RelatedDocumentsChange"),
-            (authors, "authormanual", "AuthorsChange"),
-        ]
-
         data = dict()
-        for field_data, field_name, field_change_name in fields:
+        for attribute, field_name, change_name, formatter in self._METADATA_FORM_FIELDS:
+            field_data = getattr(dcc_record, attribute)
+
+            if formatter is not None:
+                field_data = formatter(field_data)
+
             if field_data is not None:
                 data[field_name] = field_data
-                data[field_change_name] = "Replace"
+                data[change_name] = "Replace"
             else:
                 data[field_name] = ""
-                data[field_change_name] = "Append"
+                data[change_name] = "Append"
 
         return data
 
@@ -225,7 +296,7 @@ class DCCAuthenticatedSession(DCCSession, CIECPSession):
     """
 
     def dcc_record_url(self, dcc_number, xml=True):
-        pieces = [dcc_number.category, dcc_number.numeric, dcc_number.version_suffix]
+        pieces = [dcc_number.format()]
 
         if xml:
             pieces.append("/of=xml")
@@ -252,12 +323,7 @@ class DCCUnauthenticatedSession(DCCSession, Session):
     """
 
     def dcc_record_url(self, dcc_number, xml=True):
-        pieces = [
-            dcc_number.category,
-            dcc_number.numeric,
-            dcc_number.version_suffix,
-            "/public",
-        ]
+        pieces = [dcc_number.format(), "/public"]
 
         if xml:
             pieces.append("/of=xml")
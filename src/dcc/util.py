@@ -1,21 +1,27 @@
 """Utilities."""
 
+import io
+import mmap
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 
-# Allowed opened file mode pairs.
-_MODE_MAP = (
-    ("r", "r"),
-    ("r", "+"),
-    ("w", "w"),
-    ("w", "+"),
-    ("x", "x"),
-    ("a", "a"),
-    ("+", "+"),
-    ("+", "r"),
-    ("+", "w"),
-)
+# Characters allowed in the modes of opened files for each character of a requested
+# mode.
+_MODE_MAP = {
+    "r": frozenset("r+"),
+    "w": frozenset("w+"),
+    "x": frozenset("x"),
+    "a": frozenset("a"),
+    "+": frozenset("+rw"),
+}
+
+
+@lru_cache(maxsize=None)
+def _compatible_mode_chars(mode):
+    """Characters of opened file modes compatible with the requested `mode`."""
+    return frozenset().union(*(_MODE_MAP.get(char, ()) for char in mode))
 
 
 def change_exc_msg(exc, new_msg):
@@ -23,20 +29,6 @@ def change_exc_msg(exc, new_msg):
     exc.args = (new_msg,) + exc.args[1:]
 
 
-def remove_none(container):
-    """Remove None values from the specified container.
-
-    Adapted from https://stackoverflow.com/a/20558778/2251982.
-    """
-    if isinstance(container, (list, tuple, set)):
-        return type(container)(remove_none(x) for x in container if x is not None)
-    elif isinstance(container, dict):
-        return type(container)(
-            (k, remove_none(v)) for k, v in container.items() if v is not None
-        )
-    return container
-
-
 @contextmanager
 def opened_file(fobj, mode):
     """Get an open file regardless of whether a string or an already open file is
@@ -46,7 +38,8 @@ def opened_file(fobj, mode):
     ----------
     fobj : str, :class:`pathlib.Path`, or file-like
         The path or file object to ensure is open. If `fobj` is an already open file
-        object, its mode is checked to be correct but is otherwise returned as-is. If
+        object, its mode (or for in-memory files such as :class:`io.BytesIO`, its type
+        and capabilities) is checked to be correct but is otherwise returned as-is. If
         `fobj` is a string, it is opened with the specified `mode` and yielded, then
         closed once the wrapped context exits. Note that passed open file objects are
         *not* closed.
@@ -70,16 +63,11 @@ def opened_file(fobj, mode):
     if isinstance(fobj, (str, Path)):
         fobj = open(fobj, mode)
         close = True  # Close the file we just opened once we're done.
+    elif not hasattr(fobj, "mode") and isinstance(fobj, io.IOBase):
+        # An in-memory file such as :class:`io.BytesIO`, which has no mode.
+        _check_unnamed_file_mode(fobj, mode)
     else:
-        try:
-            # Ensure mode agrees.
-            if not any(lm in mode and rm in fobj.mode for lm, rm in _MODE_MAP):
-                raise ValueError(
-                    f"Unexpected mode for {repr(fobj.name)} (expected mode compatible "
-                    f"with {repr(mode)}, got {repr(fobj.mode)})."
-                )
-        except AttributeError:
-            raise ValueError(f"{repr(fobj)} is not an open file or path.")
+        _check_file_mode(fobj, mode)
 
     try:
         yield fobj
@@ -88,6 +76,69 @@ def opened_file(fobj, mode):
             fobj.close()
 
 
+def _check_unnamed_file_mode(fobj, mode):
+    """Check an open file without a mode supports the requested `mode`."""
+    if "b" in mode:
+        compatible = not isinstance(fobj, io.TextIOBase)
+    else:
+        compatible = isinstance(fobj, io.TextIOBase)
+
+    if "r" in mode or "+" in mode:
+        compatible = compatible and fobj.readable()
+
+    if any(char in mode for char in "wxa+"):
+        compatible = compatible and fobj.writable()
+
+    if not compatible:
+        raise ValueError(
+            f"Unexpected file type for {repr(fobj)} (expected file compatible with "
+            f"mode {repr(mode)})."
+        )
+
+
+def _check_file_mode(fobj, mode):
+    """Check an open file's mode is compatible with the requested `mode`."""
+    try:
+        # Ensure mode agrees.
+        if _compatible_mode_chars(mode).isdisjoint(fobj.mode):
+            raise ValueError(
+                f"Unexpected mode for {repr(fobj.name)} (expected mode compatible "
+                f"with {repr(mode)}, got {repr(fobj.mode)})."
+            )
+    except AttributeError:
+        raise ValueError(f"{repr(fobj)} is not an open file or path.")
+
+
+@contextmanager
+def mapped_file(fobj):
+    """Get the contents of an open binary file, memory mapping it where possible.
+
+    Mapping avoids reading the whole file into memory, which can be significant for
+    large files.
+
+    Parameters
+    ----------
+    fobj : file-like
+        The open binary file. It is not closed when the wrapped context exits.
+
+    Yields
+    ------
+    :class:`mmap.mmap` or :class:`bytes`
+        The file contents. If `fobj` cannot be mapped (e.g. it is a stream, such as
+        stdin, or an empty file), its contents are read instead.
+    """
+    try:
+        contents = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        yield fobj.read()
+        return
+
+    try:
+        yield contents
+    finally:
+        contents.close()
+
+
 def human_file_size(length):
     """Convert length in bytes to a human file size.
 
@@ -1,4 +1,4 @@
-from functools import partial
+from functools import lru_cache, partial
 from pathlib import Path
 import pytest
 from dcc.records import DCCArchive, DCCNumber, DCCRecord
@@ -7,7 +7,14 @@ from dcc.sessions import DCCUnauthenticatedSession
 DATA_DIR = Path(__file__).parent / "data"
 
 
-@pytest.fixture
+@lru_cache(maxsize=None)
+def _read_xml_response(identifier):
+    path = DATA_DIR / f"dcc-number-{identifier}.xml"
+    with path.open("r") as fobj:
+        return fobj.read()
+
+
+@pytest.fixture(scope="session")
 def xml_response():
     def _(item):
         if isinstance(item, DCCNumber):
@@ -15,18 +22,18 @@ def xml_response():
         else:
             raise NotImplementedError
 
-        path = DATA_DIR / f"dcc-number-{identifier}.xml"
-        with path.open("r") as fobj:
-            return fobj.read()
+        return _read_xml_response(identifier)
 
     return _
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def ref_record():
     def _(dcc_number, **kwargs):
         identifier = dcc_number.format()
         path = DATA_DIR / f"dcc-number-{identifier}-meta.toml"
+        # Parsed metadata is cached by the file's modification time, so this only
+        # builds a new record for the test to modify as it likes.
         return DCCRecord.read(path)
 
     return _
@@ -2,6 +2,7 @@
 
 import pytest
 from dcc.records import DCCRecord, DCCNumber
+from dcc.exceptions import NoVersionError
 from dcc.testing import assert_orderless_eq, assert_record_meta_matches
 
 
@@ -11,7 +12,7 @@ def test_documents(archive):
 
     # Add a record.
     archive.archive_revision_metadata(
-        DCCRecord(dcc_number="M1234567-v2", title="A title.")
+        DCCRecord(dcc_number="M1234567-v2", title="A title."), verify=True
     )
     assert_orderless_eq(archive.documents, [DCCNumber("M1234567")])
 
@@ -94,6 +95,13 @@ def test_latest_revisions(archive):
     archive.archive_revision_metadata(record3)
     assert_orderless_eq(archive.latest_revisions, [record1, record3])
 
+    # Add a non-revision directory to the document directory. It should be ignored.
+    ignore_dir = archive.document_dir(record3.dcc_number) / "ignore-dir"
+    ignore_dir.mkdir()
+    assert ignore_dir.is_dir()
+    assert_orderless_eq(archive.latest_revisions, [record1, record3])
+    assert_orderless_eq(archive.revisions(record3.dcc_number), [record2, record3])
+
 
 def test_fetch_record(requests_mock, mock_session, xml_response, ref_record, archive):
     """Test fetching of a DCC record not in the current archive."""
@@ -234,3 +242,18 @@ def test_fetch_existing_record__with_nonversioned_number__ignore_version(
         )
 
     assert_orderless_eq(archive.records, [reference])
+
+
+def test_revision_paths(archive, tmp_path):
+    """Test revision paths follow the archive directory."""
+    dcc_number = DCCNumber("T1234567-v2")
+    revision_dir = archive.archive_dir / "T1234567" / "T1234567-v2"
+
+    assert archive.revision_dir(dcc_number) == revision_dir
+    assert archive.revision_meta_path(dcc_number) == revision_dir / "meta.toml"
+
+    archive.archive_dir = tmp_path / "other"
+    assert archive.revision_dir(dcc_number).parent.parent == tmp_path / "other"
+
+    with pytest.raises(NoVersionError):
+        archive.revision_meta_path(DCCNumber("T1234567"))
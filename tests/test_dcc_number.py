@@ -1,6 +1,7 @@
 """Test DCC numbers."""
 
 import pytest
+from dataclasses import FrozenInstanceError
 from dcc.records import DCCNumber
 
 
@@ -23,6 +24,18 @@ from dcc.records import DCCNumber
         ("LIGO-T12345-x0", None, None, "T", "12345", 0),
         ("LIGO-T12345-v2", None, None, "T", "12345", 2),
     ),
+    ids=(
+        "parts",
+        "parts-v0",
+        "parts-v1",
+        "parts-v2",
+        "int-numeric-v0",
+        "int-numeric-v1",
+        "int-numeric-v2",
+        "ligo",
+        "ligo-x0",
+        "ligo-v2",
+    ),
 )
 def test_parse(a, b, c, expected_category, expected_numeric, expected_version):
     """Test DCC number parsing."""
@@ -51,6 +64,20 @@ def test_parse(a, b, c, expected_category, expected_numeric, expected_version):
         ("T", "12345", 1 + 2j),
         ("T", "12345", 3.1 + 2.6j),
     ),
+    ids=(
+        "invalid-category",
+        "invalid-category-parts",
+        "negative-int-numeric",
+        "float-numeric",
+        "negative-float-numeric",
+        "negative-string-numeric",
+        "float-string-numeric",
+        "negative-float-string-numeric",
+        "negative-version",
+        "float-version",
+        "complex-version",
+        "complex-float-version",
+    ),
 )
 def test_invalid_parse(a, b, c):
     """Test invalid DCC number parsing."""
@@ -58,6 +85,21 @@ def test_invalid_parse(a, b, c):
         DCCNumber(a, b, c)
 
 
+@pytest.mark.parametrize(
+    "a,b,c,expected,expected_unversioned",
+    (
+        ("T12345", None, None, "T12345", "T12345"),
+        ("T", "12345", 0, "T12345-x0", "T12345"),
+        ("LIGO-T12345-v2", None, None, "T12345-v2", "T12345"),
+    ),
+)
+def test_format(a, b, c, expected, expected_unversioned):
+    """Test DCC number formatting."""
+    number = DCCNumber(a, b, c)
+    assert str(number) == number.format() == expected
+    assert number.format(version=False) == expected_unversioned
+
+
 @pytest.mark.parametrize(
     "lhs,rhs",
     (("T12345", "T12345"), ("T12345-v1", "T12345-v1"), ("T12345-v3", "T12345-v3")),
@@ -65,6 +107,7 @@ def test_invalid_parse(a, b, c):
 def test_equal(lhs, rhs):
     """Test equal numbers."""
     assert DCCNumber(lhs) == DCCNumber(rhs)
+    assert hash(DCCNumber(lhs)) == hash(DCCNumber(rhs))
 
 
 @pytest.mark.parametrize(
@@ -111,3 +154,22 @@ def test_greater_than(lhs, rhs):
 def test_less_than(lhs, rhs):
     """Test less than numbers."""
     assert DCCNumber(lhs) < DCCNumber(rhs)
+
+
+def test_immutable():
+    """Test numbers can't be modified, which would invalidate their formatting."""
+    number = DCCNumber("T12345-v1")
+
+    with pytest.raises(FrozenInstanceError):
+        number.version = 2
+
+    assert number.format() == "T12345-v1"
+
+
+def test_parse_cached():
+    """Test parsed numbers are reused, and invalid numbers still raise."""
+    assert DCCNumber.parse("T12345-v1") is DCCNumber.parse("T12345-v1")
+    assert DCCNumber.parse("T12345-v1") == DCCNumber("T", "12345", 1)
+
+    with pytest.raises(ValueError):
+        DCCNumber.parse("Y12345")
@@ -0,0 +1,191 @@
+"""Test DCC parsers."""
+
+from datetime import datetime, timedelta
+import pytest
+from lxml import etree
+from dcc import parsers
+from dcc.parsers import DCCParser, DCCXMLRecordParser, DCCXMLUpdateParser
+from dcc.records import DCCNumber
+from dcc.util import mapped_file
+from dcc.exceptions import (
+    NotLoggedInError,
+    UnrecognisedDCCRecordError,
+    UnauthorisedError,
+)
+
+DOCUMENT = """
+<html>
+    <body>
+        <p>See LIGO-T1234567-v2 and <a href="https://dcc.example.org/D7654321">this
+        drawing</a>, but not Y1234567 or T123.</p>
+    </body>
+</html>
+"""
+EXPECTED = {"T1234567-v2", "D7654321"}
+
+
+@pytest.mark.parametrize("content", (DOCUMENT, DOCUMENT.encode()))
+def test_dcc_numbers(content):
+    """Test DCC number extraction from text and bytes."""
+    assert DCCParser(content).dcc_numbers() == EXPECTED
+
+
+@pytest.mark.parametrize("content", (DOCUMENT, ""))
+def test_dcc_numbers__mapped_file(tmp_path, content):
+    """Test DCC number extraction from (possibly empty) files."""
+    path = tmp_path / "document.html"
+    path.write_text(content)
+
+    with path.open("rb") as fobj, mapped_file(fobj) as mapped:
+        found = DCCParser(mapped).dcc_numbers()
+
+    assert found == (EXPECTED if content else set())
+
+
+@pytest.mark.parametrize(
+    "body,exception",
+    (
+        ("<h3>Accessing private documents</h3>", NotLoggedInError),
+        ("<strong>Search for Documents by</strong>", UnrecognisedDCCRecordError),
+        (
+            (
+                '<dl><dt class="Error">Error:</dt><dd>User bob is not authorized to '
+                "view this document.</dd></dl>"
+            ),
+            UnauthorisedError,
+        ),
+    ),
+)
+def test_record_error_page(body, exception):
+    """Test DCC error pages are identified when parsing records."""
+    # Unclosed tags make this invalid XML, as DCC error pages are.
+    page = f"<html><head><meta charset='utf-8'></head><body><br>{body}</body></html>"
+
+    with pytest.raises(exception):
+        DCCXMLRecordParser(page)
+
+
+def test_record_invalid_page():
+    """Test invalid documents that are not DCC error pages are rejected."""
+    with pytest.raises(etree.XMLSyntaxError):
+        DCCXMLRecordParser("<html><body><br><h3>Something else</h3></body></html>")
+
+
+def _record_fields(parsed):
+    return {
+        name: getattr(parsed, name)
+        for name in (
+            "dcc_number_pieces",
+            "title",
+            "authors",
+            "abstract",
+            "keywords",
+            "note",
+            "other_version_numbers",
+            "revision_dates",
+            "attached_files",
+            "related_ids",
+            "referencing_ids",
+        )
+    }
+
+
+@pytest.mark.parametrize("dcc_number", (DCCNumber("T1234567"),))
+def test_record_incremental_parse(monkeypatch, xml_response, dcc_number):
+    """Test incrementally parsed records have the same fields as fully parsed ones."""
+    # Add some more repeated elements.
+    extra = """
+        <keyword>A keyword</keyword>
+        <file href="https://dcc.example.org/file.pdf">
+            <name>file.pdf</name>
+            <description>A file</description>
+        </file>
+        <xrefto alias="T7654321" />
+        <xrefby alias="E1234567" />
+        <xrefby />
+    </docrevision>
+</document>"""
+    content = xml_response(dcc_number)
+    content = content.replace("\n    </docrevision>\n</document>", extra)
+
+    parsed = DCCXMLRecordParser(content)
+    monkeypatch.setattr(parsers, "_INCREMENTAL_PARSE_SIZE", 0)
+    incrementally_parsed = DCCXMLRecordParser(content)
+
+    assert incrementally_parsed._repeated is not None
+    fields = _record_fields(parsed)
+    # Repeated fields can be used more than once.
+    assert _record_fields(parsed) == fields
+    assert fields["referencing_ids"] == ["E1234567"]
+    assert _record_fields(incrementally_parsed) == fields
+
+
+@pytest.mark.parametrize(
+    "body,exception",
+    (
+        ("<p>Done.<br>You were successful.</p>", None),
+        (
+            (
+                '<dl><dt class="Error">Error:</dt><dd>T1234567 is invalid</dd></dl>'
+                "<p>You were successful.</p>"
+            ),
+            None,
+        ),
+        ("<h3>Accessing private documents</h3>", NotLoggedInError),
+        ("<strong>Search for Documents by</strong>", UnrecognisedDCCRecordError),
+        (
+            '<dl><dt class="Error">Error:</dt><dd>T1234567 is invalid</dd></dl>',
+            ValueError,
+        ),
+        (
+            (
+                '<dl><dt class="Error">Error:</dt><dd>T1234567 is not modifiable by '
+                "user bob</dd></dl>"
+            ),
+            UnauthorisedError,
+        ),
+        ("", Exception),
+    ),
+)
+def test_update_result_page(body, exception):
+    """Test DCC update result pages are identified."""
+    parser = DCCXMLUpdateParser(f"<html><body>{body}</body></html>" if body else "")
+
+    if exception is None:
+        parser._parse()
+    else:
+        with pytest.raises(exception):
+            parser._parse()
+
+
+@pytest.mark.parametrize("dcc_number", (DCCNumber("T1234567"),))
+def test_record_control_characters(xml_response, dcc_number):
+    """Test control characters not allowed in XML are stripped from records."""
+    content = xml_response(dcc_number)
+    title = DCCXMLRecordParser(content).title
+    content = content.replace("<title>", "\x0b<title>")
+    content = content.replace("</title>", "\x1f</title>")
+
+    assert DCCXMLRecordParser(content).title == title
+
+
+@pytest.mark.parametrize(
+    "modified,utc_offset",
+    (
+        ("2015-02-17 17:55:30", -8),
+        ("2015-07-17 17:55:30", -7),
+        # Ambiguous (clocks go back) and nonexistent (clocks go forward) times are taken
+        # as standard time.
+        ("2021-11-07 01:30:00", -8),
+        ("2021-03-14 02:30:00", -8),
+    ),
+)
+@pytest.mark.parametrize("dcc_number", (DCCNumber("T1234567"),))
+def test_record_revision_dates(xml_response, dcc_number, modified, utc_offset):
+    """Test record modification dates are localised to Pacific Time."""
+    original = 'modified="2015-02-17 17:55:30"'
+    content = xml_response(dcc_number).replace(original, f'modified="{modified}"')
+    _, revised, _ = DCCXMLRecordParser(content).revision_dates
+
+    assert revised.replace(tzinfo=None) == datetime.fromisoformat(modified)
+    assert revised.utcoffset() == timedelta(hours=utc_offset)
@@ -1,7 +1,10 @@
 """Test DCC records."""
 
-from datetime import datetime
+import os
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
 import pytest
+from dcc import env, records, _toml
 from dcc.records import DCCNumber, DCCRecord, DCCAuthor, DCCJournalRef, DCCFile
 from dcc.testing import assert_record_meta_matches
 
@@ -20,7 +23,47 @@ def test_fetch(requests_mock, mock_session, xml_response, ref_record, dcc_number
     assert_record_meta_matches(fetched, reference)
 
 
-def test_write_read(tmp_path):
+@pytest.mark.parametrize("dcc_number", (DCCNumber("T1234567"),))
+def test_fetch__non_ascii(requests_mock, mock_session, xml_response, dcc_number):
+    """Test fetched records are decoded using the response's character set."""
+    xml = xml_response(dcc_number).replace("This is the title.", "Café")
+
+    with mock_session() as session:
+        url = session.dcc_record_url(dcc_number)
+        requests_mock.get(
+            url,
+            content=xml.encode("utf-8"),
+            headers={"Content-Type": "text/xml; charset=utf-8"},
+        )
+        fetched = DCCRecord.fetch(dcc_number, session=session)
+
+    assert fetched.title == "Café"
+
+
+@pytest.mark.parametrize("backend", ("rtoml", "fallback"))
+def test_toml_codec(monkeypatch, backend):
+    """Test the record metadata TOML codec round trips with each backend."""
+    if backend == "rtoml":
+        pytest.importorskip("rtoml")
+    else:
+        monkeypatch.setattr(_toml, "rtoml", None)
+
+    item = {
+        "title": "A title.",
+        "abstract": "Line 1.\nLine 2.",
+        "other_versions": [0, 1],
+        "creation_date": datetime(
+            2022, 1, 25, 16, 27, 30, tzinfo=timezone(timedelta(hours=-8))
+        ),
+        "authors": [{"name": "John Doe"}, {"name": "Jane Doe"}],
+    }
+
+    loaded = _toml.loads(_toml.dumps(item).encode("utf-8"))
+    assert loaded == item
+    assert isinstance(loaded["creation_date"].tzinfo, timezone)
+
+
+def test_write_read():
     """Test serialisation and deserialisation preserves record metadata."""
     record = DCCRecord(
         dcc_number="M1234567-v2",
@@ -51,7 +94,233 @@ def test_write_read(tmp_path):
         related_to=[DCCNumber("T7654321")],
     )
 
+    # Round trip in memory.
+    buffer = BytesIO()
+    record.write(buffer, verify=True)
+    buffer.seek(0)
+    loaded = DCCRecord.read(buffer)
+    assert_record_meta_matches(record, loaded)
+
+
+@pytest.mark.parametrize("max_workers", (1, 4, None))
+def test_fetch_files(requests_mock, mock_session, tmp_path, max_workers):
+    """Test fetching record files, optionally concurrently."""
+    record = DCCRecord(
+        dcc_number="M1234567-v2",
+        files=[
+            DCCFile(f"File {n}.", f"file_{n}.pdf", url=f"mock://dcc.example.org/{n}")
+            for n in range(1, 6)
+        ],
+    )
+
+    with mock_session() as session:
+        for n in range(1, 6):
+            requests_mock.get(f"mock://dcc.example.org/{n}", content=b"%d" % n)
+
+        fetched = record.fetch_files(tmp_path, max_workers=max_workers, session=session)
+
+    assert fetched == record.files
+    contents = [file_.local_path.read_bytes() for file_ in fetched]
+    assert contents == [b"%d" % n for n in range(1, 6)]
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_fetch_files__same_name(requests_mock, mock_session, tmp_path, max_workers):
+    """Test record files with the same name are fetched one at a time, in order."""
+    record = DCCRecord(
+        dcc_number="M1234567-v2",
+        files=[
+            DCCFile(f"File {n}.", "file.pdf", url=f"mock://dcc.example.org/{n}")
+            for n in range(1, 4)
+        ],
+    )
+
+    with mock_session() as session:
+        for n in range(1, 4):
+            requests_mock.get(f"mock://dcc.example.org/{n}", content=b"%d" % n * 1000)
+
+        fetched = record.fetch_files(
+            tmp_path, overwrite=True, max_workers=max_workers, session=session
+        )
+
+    assert fetched == record.files
+    assert (tmp_path / "file.pdf").read_bytes() == b"3" * 1000
+    assert [path.name for path in tmp_path.iterdir()] == ["file.pdf"]
+
+
+def test_fetch_file__existing(requests_mock, mock_session, tmp_path):
+    """Test existing record files are not fetched again unless overwriting."""
+    record = DCCRecord(
+        dcc_number="M1234567-v2",
+        files=[DCCFile("A File.", "file.pdf", url="mock://dcc.example.org/file")],
+    )
+    (tmp_path / "file.pdf").write_bytes(b"existing")
+
+    with mock_session() as session:
+        requests_mock.get("mock://dcc.example.org/file", content=b"fetched")
+        fetched = record.fetch_file(1, tmp_path, session=session)
+        assert fetched.local_path == tmp_path / "file.pdf"
+        assert fetched.local_path.read_bytes() == b"existing"
+        assert not requests_mock.called
+
+        record.fetch_file(1, tmp_path, overwrite=True, session=session)
+        assert fetched.local_path.read_bytes() == b"fetched"
+
+
+def test_discover_files(tmp_path):
+    """Test discovery of existing record files."""
+    record = DCCRecord(
+        dcc_number="M1234567-v2",
+        files=[
+            DCCFile(f"File {n}.", f"file_{n}.pdf", url=f"mock://dcc.example.org/{n}")
+            for n in range(1, 4)
+        ],
+    )
+    (tmp_path / "file_1.pdf").touch()
+    (tmp_path / "file_3.pdf").mkdir()  # Not a file.
+
+    record.discover_files(tmp_path / "missing")
+    assert all(file_.local_path is None for file_ in record.files)
+
+    record.discover_files(tmp_path)
+    local_paths = [file_.local_path for file_ in record.files]
+    assert local_paths == [tmp_path / "file_1.pdf", None, None]
+
+    # Files are discovered when reading records too.
+    record.write(tmp_path / "meta.toml")
+    read_record = DCCRecord.read(tmp_path / "meta.toml")
+    local_paths = [file_.local_path for file_ in read_record.files]
+    assert local_paths == [tmp_path / "file_1.pdf", None, None]
+
+
+@pytest.mark.parametrize(
+    "version,other_versions,expected",
+    ((1, [], True), (2, [1], True), (1, [2], False), (1000, [999], True)),
+)
+def test_is_latest_version(version, other_versions, expected):
+    """Test latest versions are identified, including large version numbers."""
+    record = DCCRecord(
+        dcc_number=DCCNumber("T", "1234567", version), other_versions=other_versions
+    )
+    assert record.is_latest_version() == expected
+
+
+def test_own_references_removed():
+    """Test references to the record itself are removed, keeping the others."""
+    record = DCCRecord(
+        dcc_number="M1234567-v2",
+        referenced_by=[
+            DCCNumber("T7654321"),
+            DCCNumber("M1234567-v1"),
+            DCCNumber("E7654321"),
+        ],
+        related_to=[DCCNumber("M1234567"), DCCNumber("T1111111")],
+    )
+
+    assert record.referenced_by == [DCCNumber("T7654321"), DCCNumber("E7654321")]
+    assert record.related_to == [DCCNumber("T1111111")]
+
+
+def test_write__none_in_lists():
+    """Test None items (e.g. empty keywords) are left out of written metadata."""
+    record = DCCRecord(
+        dcc_number="T1234567-v2", keywords=["a", None], other_versions=[None, 1]
+    )
+
+    buffer = BytesIO()
+    record.write(buffer)
+    buffer.seek(0)
+    loaded = DCCRecord.read(buffer)
+    assert loaded.keywords == ["a"]
+    assert loaded.other_versions == [1]
+
+
+def test_read__cached(tmp_path):
+    """Test records read from the same file don't share state, and see changes."""
+    path = tmp_path / "record.toml"
+    DCCRecord(dcc_number="M1234567-v2", title="A title.", keywords=["A"]).write(path)
+
+    record = DCCRecord.read(path)
+    record.keywords.append("B")
+    record.authors.append(DCCAuthor("John Doe"))
+    assert DCCRecord.read(path).keywords == ["A"]
+    assert DCCRecord.read(path).authors == []
+
+    record.title = "Another title."
+    record.write(path)
+    assert DCCRecord.read(path) == record
+
+
+def test_read__cached_same_mtime(tmp_path):
+    """Test rewritten records are read again even if their modification time and size
+    are unchanged (e.g. on file systems with coarse modification times)."""
     path = tmp_path / "record.toml"
+    DCCRecord(dcc_number="M1234567-v2", title="Title A.").write(path)
+    stat = path.stat()
+    assert DCCRecord.read(path).title == "Title A."
+
+    DCCRecord(dcc_number="M1234567-v2", title="Title B.").write(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert path.stat().st_size == stat.st_size
+    assert DCCRecord.read(path).title == "Title B."
+
+
+def test_read__cache_file(monkeypatch, tmp_path):
+    """Test records can be read from metadata cache files, if enabled."""
+    monkeypatch.setattr(env, "RECORD_CACHE", True)
+    path = tmp_path / "meta.toml"
+    cache_path = tmp_path / ".meta.toml.cache"
+    record = DCCRecord(
+        dcc_number="M1234567-v2",
+        title="A title.",
+        keywords=["A"],
+        authors=[DCCAuthor("John Doe")],
+        creation_date=datetime(2022, 1, 25, 16, 27, 30),
+    )
     record.write(path)
-    loaded = DCCRecord.read(path)
-    assert_record_meta_matches(record, loaded)
+    assert DCCRecord.read(path) == record
+    assert cache_path.is_file()
+
+    # Read from the cache file rather than the in-memory cache.
+    records._read_meta.cache_clear()
+    monkeypatch.setattr(records._toml, "loads", None)
+    assert DCCRecord.read(path) == record
+    monkeypatch.undo()
+
+    # Changes invalidate the cache file.
+    monkeypatch.setattr(env, "RECORD_CACHE", True)
+    record.title = "Another title."
+    record.write(path)
+    assert DCCRecord.read(path) == record
+
+
+def test_read_shallow(tmp_path):
+    """Test shallow records give the same fields as full ones."""
+    path = tmp_path / "meta.toml"
+    DCCRecord(
+        dcc_number="M1234567-v2", title="A title.", authors=[DCCAuthor("John Doe")]
+    ).write(path)
+    record = DCCRecord.read(path)
+
+    shallow = DCCRecord.read_shallow(path)
+    assert shallow.dcc_number == record.dcc_number
+    assert shallow.title == record.title
+    assert shallow._record is None
+    assert shallow.authors == record.authors
+    assert shallow.files == record.files
+
+
+def test_file_write(tmp_path):
+    """Test writing local file copies to paths and open files."""
+    file_ = DCCFile("A File.", "file.pdf", url="mock://dcc.example.org/file")
+    with pytest.raises(FileNotFoundError):
+        file_.write(tmp_path / "copy.pdf")
+
+    file_.local_path = tmp_path / "file.pdf"
+    file_.local_path.write_bytes(b"contents")
+    file_.write(tmp_path / "copy.pdf")
+    assert (tmp_path / "copy.pdf").read_bytes() == b"contents"
+
+    with (tmp_path / "copy2.pdf").open("wb") as fobj:
+        file_.write(fobj)
+    assert (tmp_path / "copy2.pdf").read_bytes() == b"contents"
@@ -0,0 +1,66 @@
+"""Test DCC sessions."""
+
+from requests import ConnectionError
+from dcc.records import DCCAuthor, DCCFile, DCCRecord
+
+
+def test_prime(requests_mock, mock_session):
+    """Test connection priming requests the host."""
+    with mock_session() as session:
+        requests_mock.head(session._build_dcc_url(), status_code=302)
+        session.prime()
+
+    assert requests_mock.call_count == 1
+
+
+def test_prime__error(requests_mock, mock_session):
+    """Test connection priming ignores connection errors."""
+    with mock_session() as session:
+        requests_mock.head(session._build_dcc_url(), exc=ConnectionError)
+        session.prime()
+
+    assert requests_mock.call_count == 1
+
+
+def test_retries(mock_session):
+    """Test requests to the DCC host are retried."""
+    with mock_session() as session:
+        adapter = session.get_adapter(session._build_dcc_url())
+
+    assert adapter.max_retries.total == session.max_retries
+    assert 503 in adapter.max_retries.status_forcelist
+
+
+def test_fetch_file_contents(requests_mock, mock_session):
+    """Test file contents are streamed in large chunks."""
+    file_ = DCCFile("A File.", "file.pdf", url="mock://dcc.example.org/file")
+    requests_mock.get(file_.url, content=b"x" * 1000)
+
+    with mock_session() as session:
+        chunks = list(session.fetch_file_contents(file_))
+
+    assert chunks == [b"x" * 1000]
+
+
+def test_metadata_form(mock_session):
+    """Test update forms replace only the fields that are set."""
+    record = DCCRecord(
+        dcc_number="T1234567", title="A title.", keywords=["A", "B"], related_to=[]
+    )
+    authors = [DCCAuthor("John Doe"), DCCAuthor(" Jane  van   Doe "), DCCAuthor("Bob")]
+
+    with mock_session() as session:
+        data = session._build_dcc_metadata_form(record)
+
+    assert data["TitleField"] == "A title."
+    assert data["TitleChange"] == "Replace"
+    assert data["KeywordsField"] == "A B"
+    assert data["authormanual"] == ""
+    assert data["AuthorsChange"] == "Append"
+
+    record.authors = authors
+    with mock_session() as session:
+        data = session._build_dcc_metadata_form(record)
+
+    assert data["authormanual"] == "Doe, John\nvan Doe, Jane\nBob"
+    assert data["AuthorsChange"] == "Replace"